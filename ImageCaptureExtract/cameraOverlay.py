@@ -6,31 +6,54 @@ Handles live camera preview with overlay, guides, and saves captured images loca
 """
 # ==== Standard Library ====
 
-import os
 import cv2
 import time
-from datetime import datetime
-from utils import generate_s3_key
-from config.config import STORAGE_ROOT
+from utils import build_capture_paths
+from config.config import STORAGE_ROOT, FUSION_FRAMES, FUSION_METHOD
+from ImageCaptureExtract.frameFusion import FrameFusionBuffer
+
+# Routed mode: one generic box wide enough for a boarding pass, tall enough for a passport
+ROUTED_GUIDE_BOX = (0.10, 0.15, 0.90, 0.85)
 
 class CameraOverlay:
-    def __init__(self, camera_id=0):
+    guide_box = ROUTED_GUIDE_BOX   # where capture_document_with_overlay asks for the document
+
+    def __init__(self, camera_id=0, fusion_frames=FUSION_FRAMES, fusion_method=FUSION_METHOD, grabber=None):
         self.camera_id = camera_id
+        # Optional shared FrameGrabber (threaded, latest-frame-only); owned by the caller
+        self.grabber = grabber
+        # fusion_frames <= 1 keeps the original single-frame capture
+        self.fusion = FrameFusionBuffer(fusion_frames, fusion_method) if fusion_frames and fusion_frames > 1 else None
+        self._fused_id = None   # grabber frame last pushed into the fusion buffer
+
+    def _open(self):
+        return self.grabber if self.grabber is not None else cv2.VideoCapture(self.camera_id)
+
+    def _close(self, cap):
+        if cap is not self.grabber:
+            cap.release()
+
+    def _push_fusion(self, cap, gray):
+        """
+        Push a new frame into the fusion buffer. A grabber returns its latest frame again when
+        the UI loop outruns the camera; repeats would fill the buffer with copies of one frame.
+        """
+        frame_id = getattr(cap, "read_frame_id", None)
+        if frame_id is not None:
+            if frame_id == self._fused_id:
+                return
+            self._fused_id = frame_id
+        self.fusion.push(gray)
 
     def capture_passport_with_overlay(self, doc_type, subtype, agency, country, state, airportcode):
         """Capture passport image with overlay (square)."""
-        date = datetime.now().strftime("%Y%m%d")
-        s3_key_full = generate_s3_key(
-            images="Images", agency=agency, country=country, state=state,
-            airportcode=airportcode, date=date, document_type=doc_type, subtype=subtype
+        local_full_path, local_crop_path, s3_key_full, s3_key_crop = build_capture_paths(
+            STORAGE_ROOT, doc_type, subtype, agency, country, state, airportcode
         )
-        s3_key_crop = s3_key_full.replace(f"/{subtype}/", f"/{subtype}-crop/")
-        local_full_path = os.path.join(STORAGE_ROOT, s3_key_full)
-        local_crop_path = os.path.join(STORAGE_ROOT, s3_key_crop)
-        os.makedirs(os.path.dirname(local_full_path), exist_ok=True)
-        os.makedirs(os.path.dirname(local_crop_path), exist_ok=True)
 
-        cap = cv2.VideoCapture(self.camera_id)
+        cap = self._open()
+        if self.fusion:
+            self.fusion.reset()
         guide_color = (0, 255, 0)
         alpha = 0.4
 
@@ -51,6 +74,8 @@ class CameraOverlay:
             roi = frame[y1:y2, x1:x2]
             if roi.size > 0:
                 gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+                if self.fusion:
+                    self._push_fusion(cap, gray)
                 _, binarized = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
                 binarized_color = cv2.cvtColor(binarized, cv2.COLOR_GRAY2BGR)
                 overlay[y1:y2, x1:x2] = cv2.addWeighted(binarized_color, alpha, roi, 1 - alpha, 0)
@@ -67,13 +92,15 @@ class CameraOverlay:
             elif key == 32:  # SPACE
                 cv2.imwrite(local_full_path, frame)
                 if roi.size > 0:
+                    if self.fusion and self.fusion.ready():
+                        binarized = self.fusion.binarize()
                     cv2.imwrite(local_crop_path, binarized)
                     print(f"Full image saved as: {local_full_path}")
                     print(f"Cropped doc region (binarized) saved as: {local_crop_path}")
-                cap.release()
+                self._close(cap)
                 cv2.destroyAllWindows()
                 return local_full_path, local_crop_path, s3_key_full, s3_key_crop
-        cap.release()
+        self._close(cap)
         cv2.destroyAllWindows()
         time.sleep(2) 
         return None, None, None, None
@@ -81,18 +108,13 @@ class CameraOverlay:
     def capture_boarding_pass_with_overlay(self, doc_type, subtype, agency, country, state, airportcode):
         time.sleep(4) 
         """Capture boarding pass image with overlay (rectangular)."""
-        date = datetime.now().strftime("%Y%m%d")
-        s3_key_full = generate_s3_key(
-            images="Images", agency=agency, country=country, state=state,
-            airportcode=airportcode, date=date, document_type=doc_type, subtype=subtype
+        local_full_path, local_crop_path, s3_key_full, s3_key_crop = build_capture_paths(
+            STORAGE_ROOT, doc_type, subtype, agency, country, state, airportcode
         )
-        s3_key_crop = s3_key_full.replace(f"/{subtype}/", f"/{subtype}-crop/")
-        local_full_path = os.path.join(STORAGE_ROOT, s3_key_full)
-        local_crop_path = os.path.join(STORAGE_ROOT, s3_key_crop)
-        os.makedirs(os.path.dirname(local_full_path), exist_ok=True)
-        os.makedirs(os.path.dirname(local_crop_path), exist_ok=True)
 
-        cap = cv2.VideoCapture(self.camera_id)
+        cap = self._open()
+        if self.fusion:
+            self.fusion.reset()
         guide_color = (0, 255, 0)
         alpha = 0.4
 
@@ -114,6 +136,8 @@ class CameraOverlay:
             roi = frame[y1:y2, x1:x2]
             if roi.size > 0:
                 gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+                if self.fusion:
+                    self._push_fusion(cap, gray)
                 _, binarized = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
                 binarized_color = cv2.cvtColor(binarized, cv2.COLOR_GRAY2BGR)
                 overlay[y1:y2, x1:x2] = cv2.addWeighted(binarized_color, alpha, roi, 1 - alpha, 0)
@@ -130,12 +154,66 @@ class CameraOverlay:
             elif key == 32:  # SPACE
                 cv2.imwrite(local_full_path, frame)
                 if roi.size > 0:
+                    if self.fusion and self.fusion.ready():
+                        binarized = self.fusion.binarize()
                     cv2.imwrite(local_crop_path, binarized)
                     print(f"Full image saved as: {local_full_path}")
                     print(f"Cropped doc region (binarized) saved as: {local_crop_path}")
-                cap.release()
+                self._close(cap)
                 cv2.destroyAllWindows()
                 return local_full_path, local_crop_path, s3_key_full, s3_key_crop
-        cap.release()
+        self._close(cap)
+        cv2.destroyAllWindows()
+        return None, None, None, None
+    def capture_document_with_overlay(self):
+        """
+        Capture any document with a single generic guide box (routed mode).
+        Returns (frame, binarized_crop) in memory, or (None, None) when the operator quits;
+        the caller classifies the frame and decides where it is saved.
+        """
+        cap = self._open()
+        if self.fusion:
+            self.fusion.reset()
+        guide_color = (0, 255, 0)
+        alpha = 0.4
+
+        print("Place the next DOCUMENT (passport or boarding pass) inside the green box. Press SPACE to capture, ESC when done.")
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                print("Camera error")
+                break
+
+            overlay = frame.copy()
+            h, w, _ = frame.shape
+            x1, y1 = int(ROUTED_GUIDE_BOX[0] * w), int(ROUTED_GUIDE_BOX[1] * h)
+            x2, y2 = int(ROUTED_GUIDE_BOX[2] * w), int(ROUTED_GUIDE_BOX[3] * h)
+            cv2.rectangle(overlay, (x1, y1), (x2, y2), guide_color, 4)
+
+            roi = frame[y1:y2, x1:x2]
+            if roi.size > 0:
+                gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+                if self.fusion:
+                    self._push_fusion(cap, gray)
+                _, binarized = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+                binarized_color = cv2.cvtColor(binarized, cv2.COLOR_GRAY2BGR)
+                overlay[y1:y2, x1:x2] = cv2.addWeighted(binarized_color, alpha, roi, 1 - alpha, 0)
+            out = cv2.addWeighted(overlay, 1, frame, 0, 0)
+
+            cv2.putText(out, "Place DOCUMENT in GREEN box. SPACE to capture. ESC when done.",
+                        (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            cv2.imshow("Camera - Document Overlay", out)
+
+            key = cv2.waitKey(1)
+            if key == 27:  # ESC
+                print("User finished capturing.")
+                break
+            elif key == 32 and roi.size > 0:  # SPACE
+                if self.fusion and self.fusion.ready():
+                    binarized = self.fusion.binarize()
+                self._close(cap)
+                cv2.destroyAllWindows()
+                return frame, binarized
+        self._close(cap)
         cv2.destroyAllWindows()
-        return None, None, None, None
\ No newline at end of file
+        return None, None
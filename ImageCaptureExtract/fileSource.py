@@ -0,0 +1,85 @@
+"""
+FileImageSource
+---------------
+Drop-in replacement for CameraOverlay that reads documents from image files
+(headless runs, load tests, uploaded images).
+"""
+# ==== Standard Library ====
+
+import shutil
+import cv2
+from utils import build_capture_paths, save_capture
+from config.config import STORAGE_ROOT
+
+class FileImageSource:
+    def __init__(self, images=None, documents=None, storage_root=None):
+        """
+        images: dict mapping "passport", "arrival" and "departure" to image paths (staged mode).
+        documents: image paths in any order (routed mode, see capture_document_with_overlay).
+        Images are assumed to be already cropped to the document. A .pdf (e.g. a mobile
+        boarding pass) is stored as-is and later read from its text layer; in routed mode
+        its first page is rendered only for the classifier.
+        """
+        self.images = dict(images or {})
+        self.documents = list(documents or [])
+        self.storage_root = storage_root or STORAGE_ROOT
+        self._pdf = None   # source of the last routed document, if it was a PDF
+
+    def _capture(self, name, doc_type, subtype, agency, country, state, airportcode):
+        src = self.images.get(name)
+        if not src:
+            print(f"No image configured for {name}.")
+            return None, None, None, None
+        if src.lower().endswith(".pdf"):
+            return self._store_pdf(src, doc_type, subtype, agency, country, state, airportcode)
+        img = cv2.imread(src)
+        if img is None:
+            raise FileNotFoundError(f"Cannot load image: {src}")
+
+        local_full_path, local_crop_path, s3_key_full, s3_key_crop = build_capture_paths(
+            self.storage_root, doc_type, subtype, agency, country, state, airportcode
+        )
+        shutil.copyfile(src, local_full_path)
+        cv2.imwrite(local_crop_path, self._binarize(img))
+        return local_full_path, local_crop_path, s3_key_full, s3_key_crop
+
+    def _store_pdf(self, src, doc_type, subtype, agency, country, state, airportcode):
+        local_path, _, s3_key, _ = build_capture_paths(
+            self.storage_root, doc_type, subtype, agency, country, state, airportcode, ext="pdf"
+        )
+        shutil.copyfile(src, local_path)
+        return local_path, local_path, s3_key, s3_key
+
+    def _binarize(self, img):
+        # Same binarization as the camera path
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        _, binarized = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binarized
+
+    def capture_passport_with_overlay(self, doc_type, subtype, agency, country, state, airportcode):
+        return self._capture("passport", doc_type, subtype, agency, country, state, airportcode)
+
+    def capture_boarding_pass_with_overlay(self, doc_type, subtype, agency, country, state, airportcode):
+        return self._capture(subtype, doc_type, subtype, agency, country, state, airportcode)
+
+    def capture_document_with_overlay(self):
+        """Next queued document as (frame, binarized_crop), or (None, None) when exhausted."""
+        if not self.documents:
+            return None, None
+        src = self.documents.pop(0)
+        self._pdf = None
+        if src.lower().endswith(".pdf"):
+            from processingTransform.pdfExtract import PDFTextExtractor
+            img = PDFTextExtractor(src).render_page(dpi=150)
+            self._pdf = src
+        else:
+            img = cv2.imread(src)
+        if img is None:
+            raise FileNotFoundError(f"Cannot load image: {src}")
+        return img, self._binarize(img)
+
+    def save_document(self, frame, crop, doc_type, subtype, agency, country, state, airportcode):
+        """Store the last routed document: a PDF as-is, an image like save_capture."""
+        if self._pdf:
+            return self._store_pdf(self._pdf, doc_type, subtype, agency, country, state, airportcode)
+        return save_capture(frame, crop, doc_type, subtype, agency, country, state, airportcode, self.storage_root)
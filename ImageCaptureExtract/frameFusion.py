@@ -0,0 +1,77 @@
+"""
+frameFusion.py
+--------------
+Keeps a small ring buffer of recent ROI frames and fuses them before binarization.
+"""
+# ==== Standard Library ====
+
+from collections import deque
+
+import cv2
+import numpy as np
+
+FUSION_METHODS = ("median", "sharpness")
+
+
+class FrameFusionBuffer:
+    def __init__(self, size=5, method="median", align=True):
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {method} (expected one of {FUSION_METHODS})")
+        self.size = max(1, int(size))
+        self.method = method
+        self.align = align
+        self.frames = deque(maxlen=self.size)
+
+    def reset(self):
+        self.frames.clear()
+
+    def push(self, gray):
+        """Add a grayscale ROI frame. Frames of a different shape restart the buffer."""
+        if self.frames and self.frames[-1].shape != gray.shape:
+            self.frames.clear()
+        self.frames.append(gray.copy())
+
+    def ready(self):
+        return len(self.frames) == self.size
+
+    def _aligned_stack(self):
+        """Stack buffered frames, shifting each onto the newest one (phase correlation)."""
+        ref = self.frames[-1]
+        if not self.align or len(self.frames) == 1:
+            return np.stack(self.frames).astype(np.float32)
+
+        ref_f = ref.astype(np.float32)
+        h, w = ref.shape
+        window = cv2.createHanningWindow((w, h), cv2.CV_32F)
+        stack = np.empty((len(self.frames), h, w), dtype=np.float32)
+        for i, frame in enumerate(self.frames):
+            frame_f = frame.astype(np.float32)
+            if frame is ref:
+                stack[i] = frame_f
+                continue
+            (dx, dy), _ = cv2.phaseCorrelate(ref_f, frame_f, window)
+            shift = np.float32([[1, 0, -dx], [0, 1, -dy]])
+            stack[i] = cv2.warpAffine(frame_f, shift, (w, h), borderMode=cv2.BORDER_REPLICATE)
+        return stack
+
+    def fuse(self):
+        """Return the fused grayscale ROI (uint8), or None if the buffer is empty."""
+        if not self.frames:
+            return None
+        stack = self._aligned_stack()
+        if self.method == "median":
+            fused = np.median(stack, axis=0)
+        else:
+            # Weight each frame by its variance of Laplacian (blurry frames count less)
+            sharpness = np.array([cv2.Laplacian(f, cv2.CV_32F).var() for f in stack], dtype=np.float32)
+            weights = sharpness / sharpness.sum() if sharpness.sum() > 0 else np.full(len(stack), 1.0 / len(stack), dtype=np.float32)
+            fused = np.tensordot(weights, stack, axes=1)
+        return np.clip(fused, 0, 255).astype(np.uint8)
+
+    def binarize(self):
+        """Fuse the buffer and binarize with Otsu, same as the single-frame path."""
+        fused = self.fuse()
+        if fused is None:
+            return None
+        _, binarized = cv2.threshold(fused, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binarized
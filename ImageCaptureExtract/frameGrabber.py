@@ -0,0 +1,62 @@
+"""
+FrameGrabber
+------------
+Dedicated capture thread per camera that keeps only the latest frame, so slow
+consumers (overlay rendering, OCR) never back up the camera buffer.
+"""
+# ==== Standard Library ====
+
+import time
+import threading
+import cv2
+
+class FrameGrabber:
+    def __init__(self, camera_id=0):
+        self.camera_id = camera_id
+        self.cap = None
+        self.frame = None
+        self.frame_id = 0        # increments on every new frame
+        self.frame_time = None
+        self.dropped = 0         # frames overwritten before anyone read them
+        self._last_read_id = 0
+        self.read_frame_id = 0   # frame_id of the frame the last read() returned
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.cap = cv2.VideoCapture(self.camera_id)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"grabber-{self.camera_id}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            with self._lock:
+                if self.frame_id > self._last_read_id:
+                    self.dropped += 1
+                self.frame = frame
+                self.frame_id += 1
+                self.frame_time = time.perf_counter()
+
+    def read(self):
+        """Same contract as cv2.VideoCapture.read(): (ok, latest frame). Frames are never mutated."""
+        with self._lock:
+            self._last_read_id = self.frame_id
+            self.read_frame_id = self.frame_id
+            return self.frame is not None, self.frame
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
@@ -6,25 +6,22 @@ Main entry point. Orchestrates the workflow using modular classes.
 
 # ==== Standard Library ====
 import os
-import json
-from datetime import datetime
-from matplotlib import pyplot as plt
 
-from ImageCaptureExtract.imageCapture import CaptureImageStreamlit
 from ImageCaptureExtract.cameraOverlay import CameraOverlay
-from formOpLoad.formOperations import (
-    load_json, merge_dicts, customs_declaration_cli_form, FormOperations
-)
 from cloudStorageExtract.storageS3 import S3Storage
-from parsingTransform.dataStructuring import DataStandardizer
-from processingTransform.ocrExtract import OCRExtractor
-from submitLoad.email import send_submission_email
-from utils import (
-    process_passport_document, process_boarding_pass_document, get_completed_form_dir,
-    generate_s3_key, completed_form_s3_key, extract_user_info_from_form,
-    generate_confirmation_number
+from cloudStorageExtract.dailyRollup import DailyRollup
+from cloudStorageExtract.localStore import LocalArtifactStore
+from cloudStorageExtract.sessionBundle import SessionBundler, bundle_s3_key
+from processingTransform.docClassifier import DocumentClassifier
+from formOpLoad.formOperations import ConsoleResponder
+from submitLoad.sessionJournal import SessionJournal, get_journal_dir
+from submitLoad.submit import open_agency_submitter
+from workflow import run_passenger_workflow
+from config.config import (
+    BUCKET_NAME, AUTO_ROUTE, ROLLUP_ENABLED, JOURNAL_RESUME_MAX_AGE_S, STORAGE_ROOT, BUNDLE_SESSIONS,
+    LOCAL_STORE_ENABLED, LOCAL_STORE_MAX_BYTES, LOCAL_STORE_MAX_AGE_S, LOCAL_STORE_EVICT_INTERVAL,
+    AGENCY_ENABLED, AGENCY_DRAIN
 )
-from config.config import BUCKET_NAME, STORAGE_ROOT
 
 
 
@@ -33,77 +30,50 @@ def main():
     camera = CameraOverlay(camera_id=1)
     s3 = S3Storage(bucket_name=BUCKET_NAME)
 
-    passport_json_path = ""
-    arrival_json_path = ""
-    departure_json_path = ""
-
-    WORKFLOW_STAGES = [
-        {"type": "passport"},
-        {"type": "boarding_pass", "subtype": "arrival"},
-        {"type": "boarding_pass", "subtype": "departure"}
-    ]
-
-    for stage in WORKFLOW_STAGES:
-        if stage["type"] == "passport":
-            print("\n--- STAGE: PASSPORT ---")
-            # Returns full result AND path
-            passport_result = process_passport_document(
-                camera, s3, agency, country, state, airportcode, BUCKET_NAME)
-            passport_json_path = passport_result["json_path"]
-
-        elif stage["type"] == "boarding_pass":
-            print(f"\n--- STAGE: BOARDING PASS ({stage['subtype'].upper()}) ---")
-            if stage["subtype"] == "departure":
-                user_input = input("Process DEPARTURE boarding pass? (y/n): ").strip().lower()
-                if not user_input.startswith("y"):
-                    continue
-            bp_result = process_boarding_pass_document(
-                camera, s3, agency, country, state, airportcode, stage["subtype"], BUCKET_NAME
-            )
-            if stage["subtype"] == "arrival":
-                arrival_json_path = bp_result["json_path"]
-            else:
-                departure_json_path = bp_result["json_path"]
-
-        # --- Load, merge JSONs ---
-    passport_data = load_json(passport_json_path)
-    arrival_data = load_json(arrival_json_path)
-    departure_data = load_json(departure_json_path) if departure_json_path and os.path.exists(departure_json_path) else {}
-
-    prefill_data = merge_dicts(passport_data, arrival_data, departure_data)
+    # Capped local store: uploaded captures are evicted in the background, oldest written first
+    store = pins = None
+    if LOCAL_STORE_ENABLED:
+        store = LocalArtifactStore(
+            os.path.join(STORAGE_ROOT, "Images"), max_bytes=LOCAL_STORE_MAX_BYTES,
+            max_age_s=LOCAL_STORE_MAX_AGE_S, interval=LOCAL_STORE_EVICT_INTERVAL,
+        ).start()
+        # This passenger's artifacts stay pinned from upload until the session ends
+        pins = store.session()
+        s3 = store.uploader(s3, pins)
+
+    # Auto-routing: capture documents in any order from one loop
+    classifier = DocumentClassifier() if AUTO_ROUTE else None
+
+    # Resume the last interrupted passenger session, if any
+    journal_dir = get_journal_dir(agency, country, state, airportcode)
+    responder = ConsoleResponder()
+    journal = SessionJournal.resume_or_start(journal_dir, responder, max_age_s=JOURNAL_RESUME_MAX_AGE_S)
+
+    # Bundling: the session's uploads go out as one object (spooled next to its journal)
+    if BUNDLE_SESSIONS:
+        s3 = SessionBundler(s3, os.path.join(journal_dir, f"{journal.session_id}-bundle"),
+                            bundle_s3_key(agency, country, state, airportcode, journal.session_id))
+
+    # Completed forms are also appended to the airport-day roll-up batch
+    rollup = DailyRollup(agency, country, state, airportcode) if ROLLUP_ENABLED else None
+
+    # Agency delivery: also sends whatever earlier runs left in the outbox. One passenger per
+    # run means one declaration per batch here; lanes.py keeps a handler up for the whole shift.
+    submitter = open_agency_submitter(agency, country, state, airportcode) if AGENCY_ENABLED else None
+
+    run_passenger_workflow(camera, s3, agency, country, state, airportcode,
+                           responder=responder, classifier=classifier, journal=journal, rollup=rollup,
+                           pins=pins, submitter=submitter)
+    if submitter is not None:
+        submitter.stop(timeout=AGENCY_DRAIN)
+        submitter.client.close()
+        print(f"Agency submissions: {submitter.metrics()}")
+    if store is not None:
+        store.stop()
+        print(f"Local store: {store.metrics()}")
 
-    # --- Prefill form ---
-    form = FormOperations()
-    form.prefill(prefill_data)
-
-    # --- Rest of form ---
-    form_result = customs_declaration_cli_form(prefill_data)
-    if form_result:
-        # Generate confirmation number BEFORE saving
-        confirmation_number = generate_confirmation_number(airportcode)
-        form_result["confirmation_number"] = confirmation_number
-
-        completed_dir = get_completed_form_dir(agency, country, state, airportcode)
-        filename = f"declaration_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
-        local_path = os.path.join(completed_dir, filename)
-        with open(local_path, "w") as f:
-            json.dump(form_result, f, indent=2)
-        print(f"Submission saved to {local_path}")
-
-        s3_key = completed_form_s3_key(local_path)
-        s3.upload_file(local_path, s3_key)
-        print(f"Uploaded to S3: s3://{BUCKET_NAME}/{s3_key}")
-
-     # Email confirmation
-    name, user_email, data, confirmation_number = extract_user_info_from_form(local_path)
-    if user_email:
-        send_submission_email(user_email, name, confirmation_number, data)
-    else:
-        print("No user email provided, skipping email notification.")
-  
     print("\nAll document types processed.")
 
 if __name__ == "__main__":
     main()
 
-
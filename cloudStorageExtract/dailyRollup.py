@@ -0,0 +1,262 @@
+"""
+dailyRollup.py
+--------------
+Rolls each airport-day of completed declarations into one compressed NDJSON
+batch with a schema and a point-lookup index, uploaded as a single object
+instead of thousands of tiny declaration_*.json objects.
+
+Batch layout (next to completedformsjson/):
+    rollup/declarations.ndjson.gz    one gzip member per declaration (valid gzip as a whole)
+    rollup/declarations.index.jsonl  append-only: confirmation_number, offset, length
+    rollup/declarations.index.json   compiled index + schema, written on upload
+
+Because every declaration is its own gzip member, a single one can be fetched
+with an S3 byte-range GET and decompressed on its own.
+
+The app appends while the end-of-day CLI may backfill and upload the same
+batch, so every load, append and index write holds an exclusive fcntl lock on
+rollup/.lock and first catches up with index lines other processes appended.
+
+Run at end of day (also backfills forms written before the roll-up existed):
+    python -m cloudStorageExtract.dailyRollup --date 20250715 --upload
+"""
+# ==== Standard Library ====
+import os
+import glob
+import gzip
+import json
+import fcntl
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+DATA_FILE = "declarations.ndjson.gz"
+INDEX_LOG = "declarations.index.jsonl"
+INDEX_FILE = "declarations.index.json"
+LOCK_FILE = ".lock"
+
+# Schema of one NDJSON row (extra form fields are kept as-is)
+DECLARATION_SCHEMA = {
+    "version": 2,
+    "format": "ndjson+gzip-members",
+    "key": "confirmation_number",
+    "fields": [
+        {"name": "confirmation_number", "type": "string"},
+        {"name": "surname", "type": "string"},
+        {"name": "given_names", "type": "string"},
+        {"name": "nationality", "type": "string"},
+        {"name": "date_of_birth", "type": "string"},
+        {"name": "gender", "type": "string"},
+        {"name": "passport_number", "type": "string"},
+        {"name": "airline", "type": "string"},
+        {"name": "flight_number", "type": "string"},
+        {"name": "from_origin", "type": "string"},
+        {"name": "to_destination", "type": "string"},
+        {"name": "departure_date", "type": "string"},
+        {"name": "phone", "type": "string"},
+        {"name": "email", "type": "string"},
+        {"name": "purpose", "type": "string"},
+        {"name": "animals_plants", "type": "string"},
+        {"name": "commercial_articles", "type": "string"},
+        {"name": "currency", "type": "string"},
+        {"name": "prohibited_items", "type": "string"},
+        {"name": "truthful", "type": "boolean"},
+        {"name": "signature", "type": "string"},
+        {"name": "date_signed", "type": "string"},
+        # field -> {"document": passport | boarding_pass:<leg> | form | system, "confidence": 0-1 | null}
+        {"name": "provenance", "type": "object"},
+    ],
+}
+
+
+def get_rollup_dir(agency, country, state, airportcode, date, base_dir=None):
+    """Returns the local roll-up directory for one airport-day, ensures directory exists."""
+    if base_dir is None:
+        from config.config import STORAGE_ROOT
+        base_dir = os.path.join(STORAGE_ROOT, "Images")
+    folder = os.path.join(base_dir, agency, country, state, airportcode, date, "rollup")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+class DailyBatch:
+    """One airport-day batch; appends are incremental, crash-safe and safe across processes."""
+    def __init__(self, folder):
+        self.folder = folder
+        self.data_path = os.path.join(folder, DATA_FILE)
+        self.log_path = os.path.join(folder, INDEX_LOG)
+        self.index = {}   # confirmation_number -> (offset, length)
+        self._log_pos = 0  # bytes of the index log already applied to self.index
+        self._end = 0      # end of the last indexed member
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(folder, LOCK_FILE), "a")
+        with self._locked():
+            pass
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock plus an exclusive file lock; the index is up to date inside."""
+        with self._lock:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._load()
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load(self):
+        """Apply index lines appended since the last load (by any process). Caller holds the lock."""
+        if os.path.exists(self.log_path):
+            good = self._log_pos
+            with open(self.log_path, "rb") as f:
+                f.seek(self._log_pos)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn last line
+                    try:
+                        key, offset, length = json.loads(line)
+                    except ValueError:
+                        break
+                    self.index[key] = (offset, length)
+                    self._end = max(self._end, offset + length)
+                    good += len(line)
+            # Every writer holds the lock, so anything past the last good line is a crash leftover
+            if os.path.getsize(self.log_path) > good:
+                with open(self.log_path, "r+b") as f:
+                    f.truncate(good)
+            self._log_pos = good
+        # Drop a member written after the last indexed one (crash between the two writes)
+        if os.path.exists(self.data_path) and os.path.getsize(self.data_path) > self._end:
+            with open(self.data_path, "r+b") as f:
+                f.truncate(self._end)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def append(self, declaration):
+        """Append one declaration dict; duplicates (same confirmation number) are ignored."""
+        key = declaration.get("confirmation_number")
+        if not key:
+            raise ValueError("Declaration has no confirmation_number")
+        member = gzip.compress(json.dumps(declaration, separators=(",", ":")).encode("utf-8") + b"\n")
+        with self._locked():
+            if key in self.index:
+                return False
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+            line = (json.dumps([key, offset, len(member)]) + "\n").encode("utf-8")
+            with open(self.log_path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.index[key] = (offset, len(member))
+            self._end = offset + len(member)
+            self._log_pos += len(line)
+        return True
+
+    def read(self, key):
+        """Point lookup of one declaration from the local batch."""
+        offset, length = self.index[key]
+        with open(self.data_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(gzip.decompress(f.read(length)))
+
+    def compiled_index(self):
+        return {
+            "schema": DECLARATION_SCHEMA,
+            "data_file": DATA_FILE,
+            "records": len(self.index),
+            "members": {k: [o, l] for k, (o, l) in self.index.items()},
+        }
+
+    def write_index(self):
+        path = os.path.join(self.folder, INDEX_FILE)
+        tmp = path + ".tmp"
+        with self._locked():
+            with open(tmp, "w") as f:
+                json.dump(self.compiled_index(), f)
+            os.replace(tmp, path)
+        return path
+
+    def backfill(self, completed_dir):
+        """Add declaration_*.json files from completedformsjson/ that are not in the batch yet."""
+        added = 0
+        for path in sorted(glob.glob(os.path.join(completed_dir, "declaration_*.json"))):
+            with open(path) as f:
+                declaration = json.load(f)
+            if declaration.get("confirmation_number") and self.append(declaration):
+                added += 1
+        return added
+
+    def upload(self, s3):
+        """Upload the batch, then its index (readers never see an index ahead of the data)."""
+        index_path = self.write_index()
+        data_key = rollup_s3_key(self.data_path)
+        s3.upload_file(self.data_path, data_key)
+        s3.upload_file(index_path, rollup_s3_key(index_path))
+        return data_key
+
+
+class DailyRollup:
+    """Routes completed declarations to the batch of the current airport-day."""
+    def __init__(self, agency, country, state, airportcode, base_dir=None):
+        self.location = (agency, country, state, airportcode)
+        self.base_dir = base_dir
+        self._batches = {}
+        self._lock = threading.Lock()
+
+    def batch(self, date=None):
+        date = date or datetime.now().strftime("%Y%m%d")
+        with self._lock:
+            if date not in self._batches:
+                self._batches[date] = DailyBatch(get_rollup_dir(*self.location, date, base_dir=self.base_dir))
+            return self._batches[date]
+
+    def append(self, declaration, date=None):
+        return self.batch(date).append(declaration)
+
+
+def rollup_s3_key(local_path):
+    """Given a roll-up local path, return the S3 key with Images/ prefix."""
+    key = local_path.split("/Images/", 1)[-1]
+    return f"Images/{key}"
+
+
+def fetch_declaration(s3_client, bucket, data_key, index, confirmation_number):
+    """Fetch a single declaration from an uploaded batch with one byte-range GET."""
+    offset, length = index["members"][confirmation_number]
+    resp = s3_client.get_object(Bucket=bucket, Key=data_key, Range=f"bytes={offset}-{offset + length - 1}")
+    return json.loads(gzip.decompress(resp["Body"].read()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll up one airport-day of declarations")
+    parser.add_argument("--date", default=datetime.now().strftime("%Y%m%d"))
+    parser.add_argument("--agency", default="CPB")
+    parser.add_argument("--country", default="US")
+    parser.add_argument("--state", default="CA")
+    parser.add_argument("--airportcode", default="lax")
+    parser.add_argument("--upload", action="store_true", help="upload batch + index to S3")
+    args = parser.parse_args(argv)
+
+    rollup = DailyRollup(args.agency, args.country, args.state, args.airportcode)
+    batch = rollup.batch(args.date)
+    completed_dir = os.path.join(os.path.dirname(batch.folder), "completedformsjson")
+    added = batch.backfill(completed_dir) if os.path.isdir(completed_dir) else 0
+    batch.write_index()
+    print(f"Roll-up {batch.folder}: {len(batch)} declarations ({added} backfilled)")
+    if args.upload:
+        from cloudStorageExtract.storageS3 import S3Storage
+        from config.config import BUCKET_NAME
+        batch.upload(S3Storage(bucket_name=BUCKET_NAME))
+
+
+if __name__ == "__main__":
+    main()
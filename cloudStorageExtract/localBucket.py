@@ -0,0 +1,36 @@
+"""
+LocalBucket
+-----------
+Local stand-in for S3Storage: same upload interface, objects are written under a
+directory. Used for headless runs and load tests.
+"""
+# ==== Standard Library ====
+import os
+import time
+import shutil
+
+class LocalBucket:
+    def __init__(self, root, latency=0.0):
+        self.root = root
+        self.bucket_name = os.path.basename(os.path.normpath(root))
+        self.latency = latency  # seconds added per request, to simulate network round-trips
+
+    def _dest(self, s3_key):
+        dest = os.path.join(self.root, s3_key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        return dest
+
+    def upload_file(self, local_path, s3_key):
+        if not os.path.exists(local_path):
+            raise FileNotFoundError(f"{local_path} does not exist")
+        if self.latency:
+            time.sleep(self.latency)
+        shutil.copyfile(local_path, self._dest(s3_key))
+        return f"file://{self.root}/{s3_key}"
+
+    def upload_bytes(self, data, s3_key, content_type="application/json"):
+        if self.latency:
+            time.sleep(self.latency)
+        with open(self._dest(s3_key), "wb") as f:
+            f.write(data)
+        return f"file://{self.root}/{s3_key}"
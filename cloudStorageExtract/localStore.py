@@ -0,0 +1,346 @@
+"""
+localStore.py
+-------------
+Size- and age-capped local artifact store for STORAGE_ROOT/Images. Files are
+only evicted after their upload is confirmed, least recently written first
+(reads are not tracked: artifacts are read once, right after they are
+written), and never while pinned (pending upload, open passenger session).
+Eviction runs in small steps on a background thread so it never stalls a capture.
+
+Confirmed uploads are kept in an append-only ledger (.store/uploaded.jsonl) so
+they survive restarts; a file changed after its upload is not evictable until
+it is uploaded again. Files the store has never seen uploaded are kept.
+
+    store = LocalArtifactStore(root, max_bytes=20 * 1024**3, max_age_s=30 * 86400).start()
+    pins = store.session()                                          # one per passenger
+    s3 = store.uploader(S3Storage(bucket_name=BUCKET_NAME), pins)   # same upload interface
+    ...
+    pins.release()                                                  # session over: evictable
+"""
+# ==== Standard Library ====
+import os
+import json
+import time
+import fnmatch
+import shutil
+import threading
+from collections import OrderedDict
+
+STORE_DIR = ".store"
+LEDGER_FILE = "uploaded.jsonl"
+
+# The roll-up batch is append-only and reopened by DailyBatch; never evict it from under it
+DEFAULT_KEEP = ("*/rollup/*",)
+
+
+class LocalArtifactStore:
+    def __init__(self, root, max_bytes=None, max_age_s=None, low_water=0.9, interval=60.0,
+                 batch=200, keep=DEFAULT_KEEP):
+        """
+        max_bytes: evict down to low_water * max_bytes once usage exceeds it (None = no size cap).
+        max_age_s: evict uploaded files written this long ago (None = no age cap).
+        batch: files evicted per step, so one step stays short.
+        keep: glob patterns (relative to root) that are never evicted.
+        """
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.low_water = low_water
+        self.interval = interval
+        self.batch = batch
+        self.keep = tuple(keep or ())
+        self.ledger_path = os.path.join(self.root, STORE_DIR, LEDGER_FILE)
+        self.files = OrderedDict()   # relpath -> [size, last_written]; least recently written first
+        self.uploaded = {}           # relpath -> (s3_key, size, mtime_ns) at confirmed upload
+        self.pins = {}               # relpath -> pin count
+        self.total_bytes = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.scanned = False
+        self._evicting = False   # mid-way through a size eviction
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(os.path.dirname(self.ledger_path), exist_ok=True)
+
+    # ---- bookkeeping ----
+    def _rel(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def _add(self, rel, size, last_written):
+        old = self.files.pop(rel, None)
+        if old:
+            self.total_bytes -= old[0]
+        self.files[rel] = [size, last_written]
+        self.total_bytes += size
+
+    def _drop(self, rel):
+        old = self.files.pop(rel, None)
+        if old:
+            self.total_bytes -= old[0]
+        self.uploaded.pop(rel, None)
+
+    def _load_ledger(self):
+        """Replay the upload ledger, then rewrite it without entries for files that are gone."""
+        if not os.path.exists(self.ledger_path):
+            return
+        with open(self.ledger_path) as f:
+            for line in f:
+                try:
+                    rel, s3_key, size, mtime_ns = json.loads(line)
+                except ValueError:
+                    break  # torn last line
+                if s3_key is None:
+                    self.uploaded.pop(rel, None)
+                else:
+                    self.uploaded[rel] = (s3_key, size, mtime_ns)
+        self.uploaded = {r: u for r, u in self.uploaded.items() if os.path.exists(os.path.join(self.root, r))}
+        tmp = self.ledger_path + ".tmp"
+        with open(tmp, "w") as f:
+            for rel, (s3_key, size, mtime_ns) in self.uploaded.items():
+                f.write(json.dumps([rel, s3_key, size, mtime_ns]) + "\n")
+        os.replace(tmp, self.ledger_path)
+
+    def scan(self):
+        """Index every file under root, oldest modification first."""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != STORE_DIR]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((st.st_mtime, os.path.relpath(path, self.root), st.st_size))
+        found.sort()
+        with self._lock:
+            self._load_ledger()
+            for mtime, rel, size in reversed(found):
+                if rel not in self.files:
+                    self._add(rel, size, mtime)
+                    self.files.move_to_end(rel, last=False)
+            self.scanned = True
+        return len(found)
+
+    def track(self, path):
+        """Register a new or rewritten file as most recently used."""
+        rel = self._rel(path)
+        with self._lock:
+            self._add(rel, os.path.getsize(path), time.time())
+
+    def mark_uploaded(self, path, s3_key):
+        """Record a confirmed upload; only from now on may the file be evicted."""
+        rel = self._rel(path)
+        st = os.stat(path)
+        entry = [rel, s3_key, st.st_size, st.st_mtime_ns]
+        with self._lock:
+            with open(self.ledger_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.uploaded[rel] = (s3_key, st.st_size, st.st_mtime_ns)
+            if rel not in self.files:
+                self._add(rel, st.st_size, time.time())
+
+    def pin(self, *paths):
+        with self._lock:
+            for path in paths:
+                rel = self._rel(path)
+                self.pins[rel] = self.pins.get(rel, 0) + 1
+
+    def unpin(self, *paths):
+        with self._lock:
+            for path in paths:
+                rel = self._rel(path)
+                count = self.pins.get(rel, 0) - 1
+                if count > 0:
+                    self.pins[rel] = count
+                else:
+                    self.pins.pop(rel, None)
+
+    def is_pinned(self, path):
+        return self._rel(path) in self.pins
+
+    def session(self):
+        return ArtifactPins(self)
+
+    def uploader(self, s3, pins=None):
+        return TrackingUploader(s3, self, pins)
+
+    # ---- eviction ----
+    def _evictable(self, rel):
+        if rel in self.pins or rel not in self.uploaded:
+            return False
+        if any(fnmatch.fnmatch(rel, pattern) for pattern in self.keep):
+            return False
+        _, size, mtime_ns = self.uploaded[rel]
+        try:
+            st = os.stat(os.path.join(self.root, rel))
+        except FileNotFoundError:
+            return True  # already gone, just forget it
+        # Changed since the confirmed upload: the bucket copy is stale
+        return st.st_size == size and st.st_mtime_ns == mtime_ns
+
+    def evict_once(self):
+        """
+        One short eviction step, least recently written first, at most `batch` files: uploaded
+        files past max_age_s, and, once usage exceeds max_bytes, enough files to get back
+        under low_water * max_bytes. Returns the number of files evicted.
+        """
+        now = time.time()
+        victims = []
+        with self._lock:
+            target = self.max_bytes * self.low_water if self.max_bytes is not None else None
+            # Hysteresis: start above max_bytes, keep going (over several steps) down to the target
+            size_evicting = target is not None and (
+                self.total_bytes > self.max_bytes or (self._evicting and self.total_bytes > target))
+            projected = self.total_bytes
+            for rel, (size, last_written) in self.files.items():
+                if len(victims) >= self.batch:
+                    break
+                need_space = size_evicting and projected > target
+                too_old = self.max_age_s is not None and now - last_written > self.max_age_s
+                if not (need_space or too_old):
+                    break  # write order: every later file is newer
+                if self._evictable(rel):
+                    victims.append(rel)
+                    projected -= size
+            self._evicting = size_evicting and projected > target
+
+        evicted = 0
+        for rel in victims:
+            path = os.path.join(self.root, rel)
+            with self._lock:
+                # Re-check under the lock: a pin or rewrite may have arrived meanwhile
+                if rel not in self.files or not self._evictable(rel):
+                    continue
+                size = self.files[rel][0]
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._drop(rel)
+                with open(self.ledger_path, "a") as f:
+                    f.write(json.dumps([rel, None, 0, 0]) + "\n")
+                self.evicted_files += 1
+                self.evicted_bytes += size
+                evicted += 1
+            self._prune_dirs(os.path.dirname(path))
+        return evicted
+
+    def _prune_dirs(self, folder):
+        """Remove directories left empty by eviction, up to (not including) root."""
+        while folder.startswith(self.root + os.sep):
+            try:
+                os.rmdir(folder)
+            except OSError:
+                return
+            folder = os.path.dirname(folder)
+
+    # ---- background loop ----
+    def _run(self):
+        if not self.scanned:
+            self.scan()
+        while not self._stop.is_set():
+            evicted = self.evict_once()
+            # Keep stepping while there is work, otherwise sleep until the next check
+            self._stop.wait(0.1 if evicted else self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="local-store-evictor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self):
+        with self._lock:
+            uploaded_bytes = sum(self.files[r][0] for r in self.uploaded if r in self.files)
+            oldest = next(iter(self.files.values()), None)
+            stats = {
+                "files": len(self.files),
+                "bytes": self.total_bytes,
+                "uploaded_bytes": uploaded_bytes,
+                "pinned": len(self.pins),
+                "max_bytes": self.max_bytes,
+                "occupancy": self.total_bytes / self.max_bytes if self.max_bytes else None,
+                "oldest_age_s": time.time() - oldest[1] if oldest else None,
+                "evicted_files": self.evicted_files,
+                "evicted_bytes": self.evicted_bytes,
+                "scanned": self.scanned,
+            }
+        disk = shutil.disk_usage(self.root)
+        stats["disk_free_bytes"] = disk.free
+        stats["disk_used_fraction"] = disk.used / disk.total if disk.total else None
+        return stats
+
+
+class ArtifactPins:
+    """
+    Pins held for one passenger session: taken as each artifact reaches the store and
+    released together once the session ends, so nothing is evicted mid-session.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.paths = set()
+        self._lock = threading.Lock()
+
+    def pin(self, *paths):
+        with self._lock:
+            new = {os.path.abspath(p) for p in paths if os.path.abspath(p).startswith(self.store.root + os.sep)}
+            new -= self.paths
+            self.paths |= new
+        self.store.pin(*new)
+
+    def release(self):
+        with self._lock:
+            paths, self.paths = self.paths, set()
+        self.store.unpin(*paths)
+
+
+class TrackingUploader:
+    """
+    Wraps S3Storage (or LocalBucket) with the same interface: a file is pinned while its
+    upload is pending and handed to the store as evictable once the upload has succeeded.
+    With ArtifactPins, every file is also pinned for the session before it is uploaded
+    (captures reach the uploader straight after they are written).
+    """
+    def __init__(self, s3, store, pins=None):
+        self.s3 = s3
+        self.store = store
+        self.pins = pins
+        self.bucket_name = s3.bucket_name
+
+    def upload_file(self, local_path, s3_key):
+        in_store = os.path.abspath(local_path).startswith(self.store.root + os.sep)
+        if not in_store:
+            return self.s3.upload_file(local_path, s3_key)
+        self.store.track(local_path)
+        self.store.pin(local_path)
+        if self.pins is not None:
+            self.pins.pin(local_path)
+        try:
+            url = self.s3.upload_file(local_path, s3_key)
+            self.store.mark_uploaded(local_path, s3_key)
+            return url
+        finally:
+            self.store.unpin(local_path)
+
+    def upload_bytes(self, data, s3_key, content_type="application/json"):
+        return self.s3.upload_bytes(data, s3_key, content_type)
+
+    def mark_uploaded(self, local_path, s3_key):
+        """For files that reached the bucket another way (e.g. inside a session bundle)."""
+        if os.path.abspath(local_path).startswith(self.store.root + os.sep) and os.path.exists(local_path):
+            if self.pins is not None:
+                self.pins.pin(local_path)
+            self.store.mark_uploaded(local_path, s3_key)
+
+    def __getattr__(self, name):
+        return getattr(self.s3, name)
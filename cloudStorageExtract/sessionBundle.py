@@ -0,0 +1,179 @@
+"""
+sessionBundle.py
+----------------
+Packs one passenger session's uploads (frames, crops, raw OCR, passenger JSON,
+completed form) into a single bundle object plus a small index sidecar: two
+PUTs per passenger instead of a dozen.
+
+SessionBundler has the S3Storage upload interface, so the workflow runs
+unchanged; uploads are spooled locally (crash-safe, resumable with the
+session journal) and sent on flush().
+
+Bundle layout:
+    [member bytes ...][index JSON][8-byte magic][8-byte index length]
+    <bundle_key>.index.json   the same index, as a separate small object
+
+The index maps every original S3 key to (offset, length) inside the bundle,
+so the existing key structure stays discoverable and any single member can
+be fetched with one byte-range GET.
+"""
+# ==== Standard Library ====
+import os
+import gzip
+import json
+import shutil
+import struct
+import threading
+import uuid
+from datetime import datetime
+
+MAGIC = b"SESSBNDL"
+TRAILER = struct.Struct(">8sQ")
+MANIFEST = "manifest.jsonl"
+BUNDLE_FILE = "bundle.bin"
+# Small text members are gzip'd inside the bundle; images are already compressed
+GZIP_TYPES = ("application/json", "text/plain")
+
+
+def bundle_s3_key(agency, country, state, airportcode, session_id, date=None):
+    date = date or datetime.now().strftime("%Y%m%d")
+    return f"Images/{agency}/{country}/{state}/{airportcode}/{date}/bundles/{session_id}.bundle"
+
+
+def content_type_for(key):
+    ext = os.path.splitext(key)[1].lower()
+    return {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png",
+            ".pdf": "application/pdf", ".json": "application/json"}.get(ext, "application/octet-stream")
+
+
+class SessionBundler:
+    def __init__(self, s3, spool_dir, bundle_key):
+        """
+        s3: the real uploader (S3Storage, LocalBucket, TrackingUploader).
+        spool_dir: per-session directory; reopening the same directory resumes the bundle.
+        bundle_key: used unless the spool already records one (resumed session).
+        """
+        self.s3 = s3
+        self.bucket_name = s3.bucket_name
+        self.spool_dir = spool_dir
+        self.manifest_path = os.path.join(spool_dir, MANIFEST)
+        self.members = {}      # s3_key -> {"path", "content_type"}; a later upload replaces the member
+        self.bundle_key = bundle_key
+        self._lock = threading.Lock()
+        os.makedirs(spool_dir, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            self._replay()
+        else:
+            self._append({"bundle_key": bundle_key})
+
+    def _replay(self):
+        good = 0
+        with open(self.manifest_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn last line: that upload never returned, the stage is redone
+                if "bundle_key" in entry:
+                    self.bundle_key = entry["bundle_key"]
+                else:
+                    self.members[entry["key"]] = {"path": entry["path"], "content_type": entry["content_type"]}
+                good += len(line)
+        # Cut the torn tail so members added after the crash land on their own line
+        if os.path.getsize(self.manifest_path) > good:
+            with open(self.manifest_path, "r+b") as f:
+                f.truncate(good)
+
+    def _append(self, entry):
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _add(self, s3_key, path, content_type):
+        with self._lock:
+            self._append({"key": s3_key, "path": path, "content_type": content_type})
+            self.members[s3_key] = {"path": path, "content_type": content_type}
+        return f"bundle://{self.bundle_key}#{s3_key}"
+
+    def upload_file(self, local_path, s3_key):
+        if not os.path.exists(local_path):
+            raise FileNotFoundError(f"{local_path} does not exist")
+        return self._add(s3_key, os.path.abspath(local_path), content_type_for(s3_key))
+
+    def upload_bytes(self, data, s3_key, content_type="application/json"):
+        # In-memory payloads have no local file; spool them so a resumed session still has them
+        path = os.path.join(self.spool_dir, f"member-{uuid.uuid4().hex[:8]}-{os.path.basename(s3_key)}")
+        with open(path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return self._add(s3_key, path, content_type)
+
+    def _build(self):
+        """Write the bundle file; returns (path, index)."""
+        path = os.path.join(self.spool_dir, BUNDLE_FILE)
+        index = {
+            "version": 1,
+            "bundle_key": self.bundle_key,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "members": {},
+        }
+        with open(path, "wb") as out:
+            for s3_key, member in self.members.items():
+                with open(member["path"], "rb") as f:
+                    data = f.read()
+                encoding = None
+                if member["content_type"] in GZIP_TYPES:
+                    data, encoding = gzip.compress(data), "gzip"
+                index["members"][s3_key] = {
+                    "offset": out.tell(), "length": len(data),
+                    "content_type": member["content_type"], "encoding": encoding,
+                }
+                out.write(data)
+            payload = json.dumps(index, separators=(",", ":")).encode("utf-8")
+            out.write(payload)
+            out.write(TRAILER.pack(MAGIC, len(payload)))
+        return path, index
+
+    def flush(self):
+        """Upload the bundle, then its sidecar index; clears the spool. Returns a journal payload."""
+        with self._lock:
+            if not self.members:
+                shutil.rmtree(self.spool_dir, ignore_errors=True)
+                return {"bundle_key": None, "members": 0}
+            path, index = self._build()
+            self.s3.upload_file(path, self.bundle_key)
+            self.s3.upload_bytes(json.dumps(index, indent=2).encode("utf-8"), self.bundle_key + ".index.json")
+            # The members are now safely in the bucket: let a capped local store evict them
+            mark_uploaded = getattr(self.s3, "mark_uploaded", None)
+            if mark_uploaded is not None:
+                for s3_key, member in self.members.items():
+                    if not member["path"].startswith(os.path.abspath(self.spool_dir) + os.sep):
+                        mark_uploaded(member["path"], f"{self.bundle_key}#{s3_key}")
+            count = len(self.members)
+            self.members = {}
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+        print(f"Uploaded bundle: s3://{self.bucket_name}/{self.bundle_key} ({count} members)")
+        return {"bundle_key": self.bundle_key, "members": count}
+
+
+def read_index(s3_client, bucket, bundle_key):
+    """Read a bundle's embedded index with two small byte-range GETs (no sidecar needed)."""
+    tail = s3_client.get_object(Bucket=bucket, Key=bundle_key, Range=f"bytes=-{TRAILER.size}")["Body"].read()
+    magic, length = TRAILER.unpack(tail)
+    if magic != MAGIC:
+        raise ValueError(f"{bundle_key} is not a session bundle")
+    resp = s3_client.get_object(Bucket=bucket, Key=bundle_key, Range=f"bytes=-{TRAILER.size + length}")
+    return json.loads(resp["Body"].read()[:length])
+
+
+def fetch_member(s3_client, bucket, bundle_key, index, s3_key):
+    """Fetch one original object (by its usual S3 key) out of a bundle with one byte-range GET."""
+    member = index["members"][s3_key]
+    offset, length = member["offset"], member["length"]
+    resp = s3_client.get_object(Bucket=bucket, Key=bundle_key, Range=f"bytes={offset}-{offset + length - 1}")
+    data = resp["Body"].read()
+    return gzip.decompress(data) if member.get("encoding") == "gzip" else data
@@ -22,3 +22,9 @@ class S3Storage:
         print(f"Uploaded to S3: s3://{self.bucket_name}/{s3_key}")
         return f"s3://{self.bucket_name}/{s3_key}"
 
+    def upload_bytes(self, data, s3_key, content_type="application/json"):
+        """Upload an in-memory payload directly, without a local file round-trip."""
+        self.s3.put_object(Bucket=self.bucket_name, Key=s3_key, Body=data, ContentType=content_type)
+        print(f"Uploaded to S3: s3://{self.bucket_name}/{s3_key}")
+        return f"s3://{self.bucket_name}/{s3_key}"
+
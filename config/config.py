@@ -15,3 +15,44 @@ BUCKET_NAME = os.getenv("BUCKET_NAME", cfg["cloud_storage"]["aws_bucket"])
 STORAGE_ROOT = os.getenv("STORAGE_ROOT", "/Users/franciscoostolaza/passenger-image-extraction")
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", cfg["email"]["sendgrid_api_key"])
 YOLO_WEIGHTS = cfg["ml_models"]["yolo_weights_path"]
+
+FUSION_FRAMES = int(os.getenv("FUSION_FRAMES", cfg["capture"]["fusion_frames"]))
+FUSION_METHOD = os.getenv("FUSION_METHOD", cfg["capture"]["fusion_method"])
+AUTO_ROUTE = os.getenv("AUTO_ROUTE", str(cfg["capture"]["auto_route"])).lower() in ("1", "true", "yes")
+
+LANE_CAMERA_IDS = cfg["lanes"]["camera_ids"]
+LANE_OCR_WORKERS = int(os.getenv("LANE_OCR_WORKERS", cfg["lanes"]["ocr_workers"]))
+LANE_MAX_PENDING = int(os.getenv("LANE_MAX_PENDING", cfg["lanes"]["max_pending"]))
+LANE_MAX_WAITING = int(cfg["lanes"]["max_waiting"])
+
+JOURNAL_RESUME_MAX_AGE_S = float(cfg["journal"]["resume_max_age_min"]) * 60
+
+ROLLUP_ENABLED = bool(cfg["rollup"]["enabled"])
+ROLLUP_PER_FORM_UPLOAD = bool(cfg["rollup"]["per_form_upload"])
+
+AGENCY_ENABLED = bool(cfg["agency"]["enabled"])
+AGENCY_ENDPOINT = os.getenv("AGENCY_ENDPOINT", cfg["agency"]["endpoint"])
+AGENCY_TOKEN = os.getenv("AGENCY_TOKEN")
+AGENCY_MAX_BATCH = int(cfg["agency"]["max_batch"])
+AGENCY_MAX_WAIT = float(cfg["agency"]["max_wait_ms"]) / 1000.0
+AGENCY_POOL_SIZE = int(cfg["agency"]["pool_size"])
+AGENCY_MAX_RETRIES = int(cfg["agency"]["max_retries"])
+AGENCY_TIMEOUT = float(cfg["agency"]["timeout_s"])
+AGENCY_DRAIN = float(cfg["agency"]["drain_s"])
+
+BUNDLE_SESSIONS = bool(cfg["bundling"]["enabled"])
+
+LOCAL_STORE_ENABLED = bool(cfg["local_store"]["enabled"])
+LOCAL_STORE_MAX_BYTES = int(float(cfg["local_store"]["max_gb"]) * 1024 ** 3) or None
+LOCAL_STORE_MAX_AGE_S = int(float(cfg["local_store"]["max_age_days"]) * 86400) or None
+LOCAL_STORE_EVICT_INTERVAL = float(cfg["local_store"]["evict_interval_s"])
+
+OCR_FIELD_TEMPLATES = bool(cfg["ocr"]["field_templates"])
+OCR_FIELD_WORKERS = int(os.getenv("OCR_FIELD_WORKERS", cfg["ocr"]["field_workers"]))
+if OCR_FIELD_TEMPLATES:
+    # Field OCR runs one Tesseract process per field concurrently; keep each one single-threaded.
+    # Set once at start-up (config is imported first) so it is inherited by every Tesseract call.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+OCR_ENGINES = cfg["ocr"]["engines"]
+EASYOCR_LANGS = cfg["ocr"]["easyocr_langs"]
+EASYOCR_BATCH_SIZE = int(cfg["ocr"]["easyocr_batch_size"])
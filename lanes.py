@@ -0,0 +1,443 @@
+"""
+lanes.py
+--------
+Multi-camera capture lanes on one host. Each camera has its own FrameGrabber
+thread; captures from every lane go to one shared, bounded OCR/standardize
+worker pool. Per-lane queue depth and latency metrics are kept for monitoring.
+
+Each lane collects one passenger's documents at a time (journaled per lane).
+A passenger ends when the operator presses Shift+<lane> or the next passport
+is captured on that lane; the documents are then queued (bounded) for a
+finisher thread that runs the form, store, roll-up and email steps.
+Lanes do not resume: leftover lane journals are discarded at start-up.
+
+Keys: 1-9 capture on that lane, Shift+1-9 finish that lane's passenger,
+M prints metrics, ESC quits (passengers with a passport are finished first).
+"""
+
+# ==== Standard Library ====
+import os
+import glob
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from ImageCaptureExtract.frameGrabber import FrameGrabber
+from ImageCaptureExtract.frameFusion import FrameFusionBuffer
+from ImageCaptureExtract.cameraOverlay import ROUTED_GUIDE_BOX
+from cloudStorageExtract.storageS3 import S3Storage
+from processingTransform.docClassifier import DocumentClassifier
+from cloudStorageExtract.dailyRollup import DailyRollup
+from cloudStorageExtract.localStore import LocalArtifactStore
+from submitLoad.sessionJournal import SessionJournal, get_journal_dir
+from submitLoad.submit import open_agency_submitter
+from utils import save_capture, process_captured_document, percentile
+from workflow import complete_passenger
+from config.config import (
+    BUCKET_NAME, FUSION_FRAMES, FUSION_METHOD, LANE_CAMERA_IDS, LANE_OCR_WORKERS, LANE_MAX_PENDING,
+    LANE_MAX_WAITING, ROLLUP_ENABLED, AGENCY_ENABLED, AGENCY_DRAIN, STORAGE_ROOT,
+    LOCAL_STORE_ENABLED, LOCAL_STORE_MAX_BYTES, LOCAL_STORE_MAX_AGE_S, LOCAL_STORE_EVICT_INTERVAL
+)
+
+# Same generic guide box as the routed single-camera capture
+GUIDE_BOX = ROUTED_GUIDE_BOX
+DOCUMENT_ORDER = ("passport", "arrival", "departure")
+# Shift+1..9 on a US keyboard
+FINISH_KEYS = "!@#$%^&*("
+
+
+class OCRWorkerPool:
+    """Shared worker pool with a hard bound on queued + running jobs across all lanes."""
+    def __init__(self, workers=2, max_pending=4):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.max_pending = max_pending
+
+    def submit(self, fn, *args, block=False):
+        """Returns a Future, or None when the pool is full and block is False."""
+        if not self.slots.acquire(blocking=block):
+            return None
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class LaneMetrics:
+    def __init__(self, window=500):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0      # captures refused because the shared pool was full
+        self.in_flight = 0     # this lane's jobs queued or running in the pool
+        self.latencies = deque(maxlen=window)   # capture -> standardized result, seconds
+        self._lock = threading.Lock()
+
+    def on_submit(self):
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+
+    def on_reject(self):
+        with self._lock:
+            self.submitted -= 1
+            self.in_flight -= 1
+            self.rejected += 1
+
+    def on_done(self, latency, ok):
+        with self._lock:
+            self.in_flight -= 1
+            if ok:
+                self.completed += 1
+                self.latencies.append(latency)
+            else:
+                self.failed += 1
+
+    def snapshot(self):
+        with self._lock:
+            ms = [v * 1000 for v in self.latencies]
+            return {
+                "submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+                "rejected": self.rejected, "in_flight": self.in_flight,
+                "p50_ms": percentile(ms, 50), "p95_ms": percentile(ms, 95), "max_ms": max(ms) if ms else None,
+            }
+
+
+class LanePassenger:
+    """Documents captured on one lane for one passenger, until handed off to finish the form."""
+    def __init__(self, lane_id, journal, s3, pins=None):
+        self.lane_id = lane_id
+        self.journal = journal
+        self.s3 = s3            # uploader that pins this passenger's artifacts as they are uploaded
+        self.pins = pins        # ArtifactPins, released when the form is done (None without a store)
+        self.results = {}       # name -> process_captured_document result
+        self.claimed = set()    # names assigned, including captures still in the OCR pool
+        self.pending = 0
+        self.closed = False
+
+    def ordered_results(self):
+        return [self.results[name] for name in DOCUMENT_ORDER if name in self.results]
+
+
+class CaptureLane:
+    def __init__(self, lane_id, camera_id, pool, s3, classifier, location, journal_dir, hand_off, on_result=None,
+                 store=None):
+        self.lane_id = lane_id
+        self.grabber = FrameGrabber(camera_id)
+        self.pool = pool
+        self.s3 = s3
+        self.store = store                # LocalArtifactStore, or None
+        self.classifier = classifier
+        self.location = location          # (agency, country, state, airportcode)
+        self.journal_dir = journal_dir
+        self.hand_off = hand_off          # hand_off(LanePassenger, block) -> bool
+        self.on_result = on_result
+        self.fusion = FrameFusionBuffer(FUSION_FRAMES, FUSION_METHOD) if FUSION_FRAMES > 1 else None
+        self.metrics = LaneMetrics()
+        self.passenger = None             # LanePassenger currently at this lane
+        self._session_lock = threading.Lock()
+        self.window = f"Lane {lane_id} - camera {camera_id}"
+        self._last = None                 # (frame, binarized) from the latest render
+        self._fused_id = 0                # grabber frame last pushed into the fusion buffer
+
+    def start(self):
+        self.grabber.start()
+        return self
+
+    def stop(self):
+        self.grabber.release()
+
+    def render(self):
+        """Draw the guide overlay for the newest frame (UI thread only)."""
+        ok, frame = self.grabber.read()
+        if not ok:
+            return
+        h, w, _ = frame.shape
+        x1, y1, x2, y2 = int(GUIDE_BOX[0] * w), int(GUIDE_BOX[1] * h), int(GUIDE_BOX[2] * w), int(GUIDE_BOX[3] * h)
+        overlay = frame.copy()
+        cv2.rectangle(overlay, (x1, y1), (x2, y2), (0, 255, 0), 4)
+        roi = frame[y1:y2, x1:x2]
+        if roi.size == 0:
+            return
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        # The UI loop can outrun the camera: fuse each grabbed frame once, not once per tick
+        if self.fusion and self.grabber.read_frame_id > self._fused_id:
+            self._fused_id = self.grabber.read_frame_id
+            self.fusion.push(gray)
+        _, binarized = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        overlay[y1:y2, x1:x2] = cv2.addWeighted(cv2.cvtColor(binarized, cv2.COLOR_GRAY2BGR), 0.4, roi, 0.6, 0)
+        m = self.metrics.snapshot()
+        cv2.putText(overlay, f"LANE {self.lane_id}: key {self.lane_id} to capture | in flight {m['in_flight']}",
+                    (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        cv2.imshow(self.window, overlay)
+        self._last = (frame, binarized)
+
+    def capture(self):
+        """Hand the latest capture to the shared pool without blocking the UI."""
+        if self._last is None:
+            return
+        frame, binarized = self._last
+        if self.fusion and self.fusion.ready():
+            binarized = self.fusion.binarize()
+        # Count before submitting so a fast job can never finish before it is counted
+        self.metrics.on_submit()
+        future = self.pool.submit(self._process, frame, binarized, time.perf_counter())
+        if future is None:
+            self.metrics.on_reject()
+            print(f"Lane {self.lane_id}: OCR pool busy, capture again in a moment.")
+
+    # ---- per-passenger session ----
+    def _new_passenger(self):
+        journal = SessionJournal.start(self.journal_dir)
+        if self.store is None:
+            return LanePassenger(self.lane_id, journal, self.s3)
+        pins = self.store.session()
+        return LanePassenger(self.lane_id, journal, self.store.uploader(self.s3, pins), pins)
+
+    def _assign(self, doc_type):
+        """Pick the document slot for a capture; a second passport means a new passenger."""
+        ready = None
+        with self._session_lock:
+            if self.passenger is None:
+                self.passenger = self._new_passenger()
+            if doc_type == "passport":
+                if "passport" in self.passenger.claimed:
+                    print(f"Lane {self.lane_id}: new passport, previous passenger finished.")
+                    ready = self._close_locked()
+                    self.passenger = self._new_passenger()
+                name = "passport"
+            else:
+                name = "arrival" if "arrival" not in self.passenger.claimed else "departure"
+                if name in self.passenger.claimed:
+                    print(f"Lane {self.lane_id}: replacing previously captured {name}.")
+            passenger = self.passenger
+            passenger.claimed.add(name)
+            passenger.pending += 1
+        # Outside the lock: a full forms queue only holds up this pool worker, never the lane
+        if ready is not None:
+            self._release(ready, block=True)
+        return passenger, name
+
+    def _close_locked(self):
+        """
+        Close the current passenger (caller holds the session lock and clears self.passenger).
+        Returns it if it can be handed off now; otherwise its last capture hands it off.
+        """
+        passenger = self.passenger
+        passenger.closed = True
+        return passenger if passenger.pending == 0 else None
+
+    def _release(self, passenger, block):
+        if "passport" not in passenger.results:
+            print(f"Lane {self.lane_id}: no passport captured, passenger discarded.")
+            passenger.journal.close()
+            SessionJournal.discard(passenger.journal.path)
+            if passenger.pins is not None:
+                passenger.pins.release()
+            return True
+        return self.hand_off(passenger, block)
+
+    def _settle(self, passenger, name, result):
+        """Record a processed capture into the passenger it was assigned to."""
+        with self._session_lock:
+            passenger.pending -= 1
+            if result is not None:
+                passenger.results[name] = result
+                passenger.journal.record(name, result)
+            elif name not in passenger.results:
+                passenger.claimed.discard(name)
+            ready = passenger.closed and passenger.pending == 0
+        if ready:
+            self._release(passenger, block=True)
+
+    def take_passenger(self):
+        """Close and detach the current passenger; returns it if it is ready to hand off now."""
+        with self._session_lock:
+            if self.passenger is None or not self.passenger.claimed:
+                return None
+            ready = self._close_locked()
+            self.passenger = None
+            return ready
+
+    def finish(self):
+        """Operator ends this lane's passenger (Shift+lane key); never blocks the UI thread."""
+        with self._session_lock:
+            if self.passenger is None or not self.passenger.claimed:
+                print(f"Lane {self.lane_id}: no passenger in progress.")
+                return True
+        ready = self.take_passenger()
+        if ready is None or self._release(ready, block=False):
+            return True
+        # Forms queue full: give the passenger back so the operator can finish it again
+        with self._session_lock:
+            if self.passenger is None:
+                ready.closed = False
+                self.passenger = ready
+                print(f"Lane {self.lane_id}: forms queue is full, finish again in a moment.")
+                return False
+        # A new capture already opened the next passenger: queue this one off the UI thread
+        threading.Thread(target=self._release, args=(ready, True), daemon=True).start()
+        return True
+
+    def _process(self, frame, binarized, started):
+        ok = False
+        try:
+            doc_type, features = self.classifier.classify(frame, GUIDE_BOX)
+            if doc_type is None:
+                print(f"Lane {self.lane_id}: could not recognise the document ({features['scores']}).")
+                return None
+            passenger, name = self._assign(doc_type)
+            result = None
+            try:
+                subtype = "main" if doc_type == "passport" else name
+                paths = save_capture(frame, binarized, doc_type, subtype, *self.location)
+                result = process_captured_document(passenger.s3, doc_type, subtype, *paths)
+            finally:
+                self._settle(passenger, name, result)
+            if self.on_result:
+                self.on_result(self.lane_id, result)
+            ok = True
+            return result
+        finally:
+            self.metrics.on_done(time.perf_counter() - started, ok)
+
+
+class LaneHost:
+    def __init__(self, camera_ids, s3, location, workers=2, max_pending=4, classifier=None,
+                 max_waiting=4, responder=None, mailer=None, rollup=None, store=None, submitter=None):
+        """
+        max_waiting: finished passengers queued for the form before lanes are told to wait.
+        responder, mailer, rollup, submitter: passed to complete_passenger for every passenger;
+        store: a LocalArtifactStore; each passenger's uploads go through store.uploader with its
+        own session pins (s3 is the plain client), released when its form is done.
+        Forms run one at a time on the finisher thread (one console).
+        """
+        self.pool = OCRWorkerPool(workers, max_pending)
+        self.s3 = s3
+        self.location = location
+        self.store = store
+        self.finish_kwargs = {"responder": responder, "rollup": rollup, "submitter": submitter}
+        if mailer is not None:
+            self.finish_kwargs["mailer"] = mailer
+        self.waiting = queue.Queue(maxsize=max_waiting)
+        self.finished = 0
+        self._finisher = None
+        classifier = classifier or DocumentClassifier()
+        journal_root = get_journal_dir(*location)
+        self.lanes = []
+        for i, camera_id in enumerate(camera_ids):
+            journal_dir = os.path.join(journal_root, f"lane-{i + 1}")
+            os.makedirs(journal_dir, exist_ok=True)
+            for path in glob.glob(os.path.join(journal_dir, "session_*.jsonl")):
+                SessionJournal.discard(path)
+            self.lanes.append(CaptureLane(i + 1, camera_id, self.pool, s3, classifier, location,
+                                          journal_dir, self.hand_off, store=store))
+
+    def hand_off(self, passenger, block=True):
+        """Queue a finished lane passenger for the form; False if the queue is full and block is False."""
+        try:
+            self.waiting.put(passenger, block=block)
+        except queue.Full:
+            return False
+        print(f"Lane {passenger.lane_id}: passenger queued for the declaration form.")
+        return True
+
+    def _finish_passengers(self):
+        while True:
+            passenger = self.waiting.get()
+            if passenger is None:
+                return
+            print(f"\n=== LANE {passenger.lane_id}: DECLARATION FORM ===")
+            try:
+                complete_passenger(passenger.ordered_results(), passenger.s3, *self.location,
+                                   journal=passenger.journal, pins=passenger.pins, **self.finish_kwargs)
+                self.finished += 1
+            except Exception as e:
+                # Journal is kept for inspection; the lane carries on with the next passenger
+                print(f"Lane {passenger.lane_id}: could not finish passenger: {e}")
+
+    def metrics(self):
+        return {lane.lane_id: lane.metrics.snapshot() for lane in self.lanes}
+
+    def print_metrics(self):
+        for lane_id, m in self.metrics().items():
+            print(f"Lane {lane_id}: {m}")
+
+    def run(self):
+        """UI loop on the main thread (OpenCV windows must be driven from one thread)."""
+        for lane in self.lanes:
+            lane.start()
+        self._finisher = threading.Thread(target=self._finish_passengers, name="lane-finisher", daemon=True)
+        self._finisher.start()
+        try:
+            while True:
+                for lane in self.lanes:
+                    lane.render()
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27:  # ESC
+                    break
+                if key in (ord("m"), ord("M")):
+                    self.print_metrics()
+                elif chr(key) in FINISH_KEYS:
+                    idx = FINISH_KEYS.index(chr(key))
+                    if idx < len(self.lanes):
+                        self.lanes[idx].finish()
+                elif ord("1") <= key <= ord("9"):
+                    idx = key - ord("1")
+                    if idx < len(self.lanes):
+                        self.lanes[idx].capture()
+        finally:
+            for lane in self.lanes:
+                lane.stop()
+            cv2.destroyAllWindows()
+            self.pool.shutdown()
+            # Every capture is processed now: finish passengers that have a passport, then stop
+            for lane in self.lanes:
+                ready = lane.take_passenger()
+                if ready is not None:
+                    lane._release(ready, block=True)
+            self.waiting.put(None)
+            self._finisher.join()
+            self.print_metrics()
+            print(f"Passengers finished: {self.finished}")
+
+
+def main():
+    location = ("CPB", "US", "CA", "lax")
+    s3 = S3Storage(bucket_name=BUCKET_NAME)
+    # Capped local store, as in app.py; LaneHost wraps s3 per passenger so uploads are tracked and pinned
+    store = None
+    if LOCAL_STORE_ENABLED:
+        store = LocalArtifactStore(
+            os.path.join(STORAGE_ROOT, "Images"), max_bytes=LOCAL_STORE_MAX_BYTES,
+            max_age_s=LOCAL_STORE_MAX_AGE_S, interval=LOCAL_STORE_EVICT_INTERVAL,
+        ).start()
+    rollup = DailyRollup(*location) if ROLLUP_ENABLED else None
+    # One handler for the whole run, so declarations from every lane share micro-batches
+    submitter = open_agency_submitter(*location) if AGENCY_ENABLED else None
+    host = LaneHost(LANE_CAMERA_IDS, s3, location, workers=LANE_OCR_WORKERS, max_pending=LANE_MAX_PENDING,
+                    max_waiting=LANE_MAX_WAITING, rollup=rollup, store=store, submitter=submitter)
+    try:
+        host.run()
+    finally:
+        if submitter is not None:
+            submitter.stop(timeout=AGENCY_DRAIN)
+            submitter.client.close()
+            print(f"Agency submissions: {submitter.metrics()}")
+        if store is not None:
+            store.stop()
+            print(f"Local store: {store.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
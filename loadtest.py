@@ -0,0 +1,156 @@
+"""
+loadtest.py
+-----------
+Headless load generator: runs N simulated passengers through the full
+capture -> OCR -> form -> store -> email path with local stand-ins (image files
+instead of the camera, a local bucket instead of S3, a recording mailer instead
+of SMTP) and reports end-to-end latency distributions. Captures, completed forms
+and journals go under --storage-root (a temporary directory by default), never
+the production STORAGE_ROOT.
+
+Example:
+    python loadtest.py --passport p.jpg --arrival bp.jpg --answers config/answers.example.yaml \
+        --passengers 50 --concurrency 4
+"""
+
+# ==== Standard Library ====
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+import traceback
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+from ImageCaptureExtract.fileSource import FileImageSource
+from cloudStorageExtract.localBucket import LocalBucket
+from cloudStorageExtract.sessionBundle import SessionBundler, bundle_s3_key
+from formOpLoad.formOperations import ScriptedResponder
+from processingTransform.docClassifier import DocumentClassifier
+from submitLoad.sessionJournal import SessionJournal, get_journal_dir
+from utils import percentile
+from workflow import run_passenger_workflow
+
+
+class RecordingMailer:
+    """Stand-in for send_submission_email: records messages instead of sending them."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def __call__(self, user_email, name, confirmation_number, data):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent.append((user_email, name, confirmation_number))
+
+
+def summarize(name, values):
+    if not values:
+        return f"{name:<10} n=0"
+    ms = [v * 1000 for v in values]
+    return (f"{name:<10} n={len(ms):<5} mean={sum(ms) / len(ms):8.1f}  p50={percentile(ms, 50):8.1f}  "
+            f"p90={percentile(ms, 90):8.1f}  p95={percentile(ms, 95):8.1f}  p99={percentile(ms, 99):8.1f}  "
+            f"max={max(ms):8.1f} ms")
+
+
+def run_one(args, answers, bucket, mailer, storage_root):
+    images = {"passport": args.passport, "arrival": args.arrival, "departure": args.departure}
+    if args.auto_route:
+        # Any order: shuffle so the classifier has to route every document
+        documents = [p for p in images.values() if p]
+        random.shuffle(documents)
+        camera = FileImageSource(documents=documents, storage_root=storage_root)
+        classifier = DocumentClassifier()
+    else:
+        camera = FileImageSource(images, storage_root=storage_root)
+        classifier = None
+    responder = ScriptedResponder(answers)
+    s3 = bucket
+    if args.bundle:
+        session_id = f"loadtest-{uuid.uuid4().hex[:12]}"
+        s3 = SessionBundler(bucket, os.path.join(args.bucket_dir + "-spool", session_id),
+                            bundle_s3_key(args.agency, args.country, args.state, args.airportcode, session_id))
+    journal = None
+    if args.journal:
+        journal = SessionJournal.start(get_journal_dir(
+            args.agency, args.country, args.state, args.airportcode, os.path.join(storage_root, "Sessions")))
+    timings = {}
+    start = time.perf_counter()
+    record = run_passenger_workflow(
+        camera, s3, args.agency, args.country, args.state, args.airportcode,
+        responder=responder, mailer=mailer, timings=timings, classifier=classifier, journal=journal,
+        storage_root=storage_root
+    )
+    timings["total"] = time.perf_counter() - start
+    return record is not None, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end passenger workflow load test")
+    parser.add_argument("--passport", required=True, help="passport image file")
+    parser.add_argument("--arrival", required=True, help="arrival boarding pass image or PDF file")
+    parser.add_argument("--departure", help="departure boarding pass image or PDF file (optional)")
+    parser.add_argument("--answers", help="answers file (.json/.yaml) keyed by form field")
+    parser.add_argument("--passengers", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--bucket-dir", default="loadtest_bucket", help="local stand-in for the S3 bucket")
+    parser.add_argument("--s3-latency", type=float, default=0.0, help="seconds per simulated upload")
+    parser.add_argument("--storage-root", help="local captures, forms and journals (default: a temporary directory)")
+    parser.add_argument("--journal", action="store_true", help="journal each passenger like app.py")
+    parser.add_argument("--bundle", action="store_true", help="upload each passenger as one session bundle")
+    parser.add_argument("--email-latency", type=float, default=0.0, help="seconds per simulated email")
+    parser.add_argument("--agency", default="CPB")
+    parser.add_argument("--country", default="US")
+    parser.add_argument("--state", default="CA")
+    parser.add_argument("--airportcode", default="lax")
+    parser.add_argument("--auto-route", action="store_true", help="feed documents in random order through the classifier")
+    parser.add_argument("--verbose", action="store_true", help="show workflow output")
+    args = parser.parse_args(argv)
+
+    answers = ScriptedResponder.from_file(args.answers).answers if args.answers else {}
+    answers.setdefault("process_departure", bool(args.departure))
+    bucket = LocalBucket(args.bucket_dir, latency=args.s3_latency)
+    mailer = RecordingMailer(latency=args.email_latency)
+
+    temp_root = None
+    storage_root = args.storage_root
+    if storage_root is None:
+        temp_root = tempfile.TemporaryDirectory(prefix="loadtest-storage-")
+        storage_root = temp_root.name
+
+    results, errors = [], []
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(sys.stdout if args.verbose else devnull):
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(run_one, args, answers, bucket, mailer, storage_root)
+                       for _ in range(args.passengers)]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception:
+                    errors.append(traceback.format_exc())
+    elapsed = time.perf_counter() - start
+    if temp_root is not None:
+        temp_root.cleanup()
+
+    submitted = sum(1 for ok, _ in results if ok)
+    print(f"\nPassengers: {args.passengers}  concurrency: {args.concurrency}  "
+          f"submitted: {submitted}  not submitted: {len(results) - submitted}  errors: {len(errors)}")
+    print(f"Wall time: {elapsed:.2f}s  throughput: {len(results) / elapsed if elapsed else 0:.2f} passengers/s  "
+          f"emails: {len(mailer.sent)}")
+    stages = ["passport", "arrival", "departure", "form", "store", "email", "total"]
+    for stage in stages:
+        print(summarize(stage, [t[stage] for _, t in results if stage in t]))
+    if errors:
+        print("\nFirst error:\n" + errors[0])
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+ocr_compare.py
+--------------
+Side-by-side OCR engine comparison on this host: model load time, per-document
+latency, throughput and accuracy against a ground-truth file. Use it to pick
+the per-document-type engines in settings.yaml (ocr.engines).
+
+Ground truth (JSON), keyed by image path:
+    {
+      "samples/passport1.jpg": {"doc_type": "passport",
+                                "fields": {"passport_number": "L898902C3", "surname": "ERIKSSON"},
+                                "text": "optional full transcription for character accuracy"}
+    }
+
+Example:
+    python ocr_compare.py --truth samples/truth.json --engines tesseract easyocr --mode fields --repeat 3
+"""
+
+# ==== Standard Library ====
+import os
+import re
+import json
+import time
+import argparse
+import difflib
+from contextlib import redirect_stdout
+
+import cv2
+
+from processingTransform.ocrEngines import ENGINES, get_engine
+from processingTransform.ocrExtract import OCRExtractor, FieldOCRExtractor
+from processingTransform.layoutTemplates import get_template
+from utils import percentile
+
+
+def normalize(text):
+    """Upper case, single spaces: OCR casing/spacing noise should not count as a miss."""
+    return re.sub(r"\s+", " ", (text or "").upper()).strip()
+
+
+def score(result, truth):
+    """(fields correct, fields expected, character similarity or None) for one document."""
+    expected = truth.get("fields", {})
+    correct = 0
+    page = normalize(result.get("text"))
+    for name, value in expected.items():
+        if name in result.get("fields", {}):
+            correct += normalize(result["fields"][name]) == normalize(value)
+        else:
+            # Page mode: count the field as read when its value appears in the text
+            correct += normalize(value) in page
+    char_acc = None
+    if truth.get("text"):
+        char_acc = difflib.SequenceMatcher(None, page, normalize(truth["text"])).ratio()
+    return correct, len(expected), char_acc
+
+
+def run_engine(name, samples, mode, repeat, max_workers):
+    start = time.perf_counter()
+    engine = get_engine(name)
+    load_time = time.perf_counter() - start
+
+    latencies, correct, expected, char_accs = [], 0, 0, []
+    start = time.perf_counter()
+    for path, truth in samples:
+        doc_type = truth.get("doc_type")
+        if mode == "fields" and get_template(doc_type):
+            ocr = FieldOCRExtractor(doc_type, max_workers=max_workers, engine=engine)
+        else:
+            ocr = OCRExtractor(engine=engine)
+        for i in range(repeat):
+            t0 = time.perf_counter()
+            result = ocr_image(ocr, path)
+            latencies.append(time.perf_counter() - t0)
+            if i == 0:
+                c, n, char_acc = score(result, truth)
+                correct += c
+                expected += n
+                if char_acc is not None:
+                    char_accs.append(char_acc)
+    elapsed = time.perf_counter() - start
+
+    ms = [v * 1000 for v in latencies]
+    return {
+        "engine": name,
+        "load_s": load_time,
+        "docs": len(latencies),
+        "docs_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(ms, 50, empty=float("nan")),
+        "p95_ms": percentile(ms, 95, empty=float("nan")),
+        "field_acc": correct / expected if expected else float("nan"),
+        "char_acc": sum(char_accs) / len(char_accs) if char_accs else float("nan"),
+    }
+
+
+def ocr_image(ocr, path):
+    """OCR one image without writing a *-ocr_raw.json next to the sample (or printing its path)."""
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        return ocr.extract(image_path=path, save_json_path=os.devnull)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare OCR engines on labelled sample documents")
+    parser.add_argument("--truth", required=True, help="ground-truth JSON keyed by image path")
+    parser.add_argument("--engines", nargs="+", default=sorted(ENGINES), choices=sorted(ENGINES))
+    parser.add_argument("--mode", choices=("page", "fields"), default="page",
+                        help="whole-page OCR, or per-field template regions where a template exists")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per document (accuracy from the first)")
+    parser.add_argument("--field-workers", type=int, default=None, help="concurrent field crops (tesseract)")
+    args = parser.parse_args(argv)
+
+    with open(args.truth) as f:
+        truth = json.load(f)
+    base = os.path.dirname(os.path.abspath(args.truth))
+    samples = []
+    for path, entry in truth.items():
+        path = path if os.path.isabs(path) else os.path.join(base, path)
+        if cv2.imread(path) is None:
+            raise FileNotFoundError(f"Cannot load image: {path}")
+        samples.append((path, entry))
+
+    rows = [run_engine(name, samples, args.mode, args.repeat, args.field_workers) for name in args.engines]
+
+    print(f"\n{len(samples)} documents x {args.repeat} runs, mode={args.mode}")
+    print(f"{'engine':<10} {'load s':>7} {'docs/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'field acc':>9} {'char acc':>8}")
+    for r in rows:
+        print(f"{r['engine']:<10} {r['load_s']:7.2f} {r['docs_per_s']:7.2f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+              f"{r['field_acc']:9.1%} {r['char_acc']:8.1%}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
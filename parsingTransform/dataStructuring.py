@@ -11,10 +11,16 @@ import json
 from datetime import datetime
 import boto3
 
+from parsingTransform.referenceData import get_reference_data
+
+# Printed field labels on a passport data page; never a field value
+FIELD_LABEL = re.compile(
+    r'surn|given|name|nationalit|birth|\bsex\b|passport|authority|issue|expir|signature|\btype\b|\bcode\b',
+    re.IGNORECASE)
 
 class DataStandardizer:
     def __init__(self):
-        pass
+        self.reference = get_reference_data()
 
     def standardize(self, raw_data):
         text = raw_data["text"]
@@ -43,7 +49,7 @@ class DataStandardizer:
 
         def find_first_allcaps(lines):
             for line in lines:
-                if re.match(r'^[A-Z ]+$', line) and len(line) > 5:
+                if re.match(r'^[A-Z ]+$', line) and len(line) > 5 and not FIELD_LABEL.search(line):
                     return line.strip()
             return None
 
@@ -66,15 +72,18 @@ class DataStandardizer:
                         break
 
         nationality = find_allcaps_after('nationality', lines)
-        if not nationality:
+        if nationality:
+            # Labelled: snap to the canonical ISO 3166 name (tolerates OCR noise and demonyms)
+            nationality = self.reference.match_country(nationality) or nationality
+        else:
+            # Unlabelled lines must be a country name, alias or code exactly ("INDIANA" is not India)
             for line in lines:
-                if "UNITED" in line and "STATES" in line:
-                    nationality = "UNITED STATES"
-                    break
+                if not FIELD_LABEL.search(line):
+                    nationality = self.reference.match_country(line, exact=True)
+                    if nationality:
+                        break
         if not nationality:
             nationality = find_first_allcaps(lines)
-        if nationality:
-            nationality = nationality.replace("OF AM", "OF AMERICA").replace("UNITED STATES OF AMERICA", "UNITED STATES")
 
         dob = None
         m = re.search(r'(\d{1,2} [A-Z]{3,} \d{4})', text)
@@ -119,6 +128,103 @@ class DataStandardizer:
             "gender": gender,
             "passport_number": passport_number
         }
+
+        # Field-region OCR output (FieldOCRExtractor): per-field values and the MRZ win over text parsing
+        if raw_data.get("fields"):
+            for key, value in self.standardize_passport_fields(raw_data["fields"]).items():
+                if value:
+                    out[key] = value
+        return out
+
+    @staticmethod
+    def _mrz_check_digit(value):
+        weights = (7, 3, 1)
+        total = 0
+        for i, ch in enumerate(value):
+            if ch.isdigit():
+                n = int(ch)
+            elif ch.isalpha():
+                n = ord(ch) - ord('A') + 10
+            else:
+                n = 0
+            total += n * weights[i % 3]
+        return str(total % 10)
+
+    def parse_mrz(self, mrz_text):
+        """Parse an ICAO 9303 TD3 passport MRZ (2 x 44 characters) into passport fields, or {}."""
+        lines = [re.sub(r'\s', '', l).upper() for l in (mrz_text or '').split('\n')]
+        lines = [l for l in lines if len(l) >= 30]
+        if len(lines) < 2:
+            return {}
+        l1, l2 = (l.ljust(44, '<')[:44] for l in lines[-2:])
+        if not l1.startswith('P'):
+            return {}
+
+        surname, _, given = l1[5:].partition('<<')
+        out = {
+            "surname": surname.replace('<', ' ').strip() or None,
+            "given_names": re.sub(r'\s+', ' ', given.replace('<', ' ')).strip() or None,
+        }
+
+        number = l2[0:9]
+        # Only trust the document number when its check digit matches
+        if self._mrz_check_digit(number) == l2[9]:
+            out["passport_number"] = number.replace('<', '')
+
+        code = l2[10:13].replace('<', '')
+        code = {"D": "DEU"}.get(code, code)  # Germany uses a single-letter code
+        out["nationality"] = self.reference.match_country(code) if len(code) == 3 else None
+
+        dob = l2[13:19]
+        if dob.isdigit() and self._mrz_check_digit(dob) == l2[19]:
+            yy = int(dob[:2])
+            century = 1900 if yy > int(datetime.now().strftime('%y')) else 2000
+            try:
+                out["date_of_birth"] = datetime(century + yy, int(dob[2:4]), int(dob[4:6])).strftime("%Y-%m-%d")
+            except ValueError:
+                pass
+
+        sex = l2[20]
+        out["gender"] = {"M": "Male", "F": "Female"}.get(sex)
+        return out
+
+    def standardize_passport_fields(self, fields):
+        """Clean per-field OCR crops from the passport layout template (labels dropped), MRZ last."""
+        def value_lines(text):
+            # Labels are mixed case and/or bilingual with '/'; values are printed in capitals
+            return [l.strip() for l in (text or '').split('\n')
+                    if l.strip() and '/' not in l and not re.search(r'[a-z]', l)]
+
+        def first_value(name):
+            vals = value_lines(fields.get(name))
+            return re.sub(r'[^A-Z \-]', '', vals[0]).strip() if vals else None
+
+        out = {
+            "surname": first_value("surname"),
+            "given_names": first_value("given_names"),
+        }
+
+        nationality = first_value("nationality")
+        out["nationality"] = (self.reference.match_country(nationality) or nationality) if nationality else None
+
+        m = re.search(r'(\d{1,2} [A-Z]{3,} \d{4})', ' '.join(value_lines(fields.get("date_of_birth"))))
+        if m:
+            try:
+                out["date_of_birth"] = datetime.strptime(m.group(1), "%d %b %Y").strftime("%Y-%m-%d")
+            except ValueError:
+                out["date_of_birth"] = m.group(1)
+
+        m = re.search(r'\b(M|F)\b', ' '.join(value_lines(fields.get("gender"))))
+        if m:
+            out["gender"] = "Male" if m.group(1) == "M" else "Female"
+
+        m = re.search(r'\b([A-Z0-9]{6,9})\b', ' '.join(value_lines(fields.get("passport_number"))))
+        if m:
+            out["passport_number"] = m.group(1)
+
+        for key, value in self.parse_mrz(fields.get("mrz")).items():
+            if value:
+                out[key] = value
         return out
     
     def standardize_boarding_pass(self, raw_data):
@@ -174,22 +280,45 @@ class DataStandardizer:
 
         # 4. IATA codes: From/To or XXX/XXX, XXX-XXX
         iata = re.compile(r'\b([A-Z]{3})\b')
+        code_like = re.compile(r'\b([A-Z0-9]{3})\b')
+
+        def known_airport(line):
+            # Prefer tokens that are real airports (OCR digit/letter slips repaired)
+            for token in code_like.findall(line):
+                if sum(c.isalpha() for c in token) >= 2:
+                    code = self.reference.match_airport(token)
+                    if code:
+                        return code
+            return None
+
         for i, line in enumerate(lines):
             # Direct "From: XXX" or "To: XXX"
             if "from" in line.lower():
                 m = iata.search(line)
-                if m:
-                    from_origin = m.group(1)
+                code = known_airport(line)
+                if code or m:
+                    from_origin = code or m.group(1)
             if "to" in line.lower():
                 m = iata.search(line)
-                if m:
-                    to_destination = m.group(1)
-        # Fallback: look for XXX/XXX or XXX-XXX
+                code = known_airport(line)
+                if code or m:
+                    to_destination = code or m.group(1)
+        # Fallback: look for XXX/XXX or XXX-XXX (each side needs letters, so 555-123 is no route)
         if not (from_origin and to_destination):
+            route = re.compile(r'\b((?=[A-Z0-9]*[A-Z][A-Z0-9]*[A-Z])[A-Z0-9]{3})[\/\-]'
+                               r'((?=[A-Z0-9]*[A-Z][A-Z0-9]*[A-Z])[A-Z0-9]{3})\b')
             for line in lines:
-                m = re.search(r'\b([A-Z]{3})[\/\-]([A-Z]{3})\b', line)
-                if m:
-                    from_origin, to_destination = m.group(1), m.group(2)
+                for origin, destination in route.findall(line):
+                    codes = [self.reference.match_airport(origin), self.reference.match_airport(destination)]
+                    # An OCR digit slip is only repaired into a code the airport table knows
+                    if all(codes):
+                        from_origin, to_destination = codes
+                    elif origin.isalpha() and destination.isalpha():
+                        from_origin, to_destination = origin, destination
+                    else:
+                        continue
+                    break
+                if from_origin and to_destination:
                     break
 
         # 5. Departure date: DD MMM, MM/DD/YYYY, YYYY-MM-DD
@@ -220,6 +349,20 @@ class DataStandardizer:
         # Normalize airline name (optional): drop (BA), trim, etc
         if airline:
             airline = re.sub(r'\([^)]*\)', '', airline).strip()
+            canonical = self.reference.match_airline(airline)
+            if canonical:
+                airline = canonical.title()
+        else:
+            # No airline line: the flight number's carrier prefix decides; an airline name in
+            # the top lines is only used without one (a line disagreeing with it is a name or word)
+            canonical = self.reference.airline_from_flight(flight_number) if flight_number else None
+            if not canonical:
+                for line in lines[:5]:
+                    canonical = self.reference.match_airline(line, free_text=True)
+                    if canonical:
+                        break
+            if canonical:
+                airline = canonical.title()
 
         # Normalize passenger name: JOHN DOE -> Doe, John (if possible)
         if passenger_name and '/' in passenger_name:
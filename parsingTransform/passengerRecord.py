@@ -0,0 +1,96 @@
+"""
+passengerRecord.py
+------------------
+Compact in-memory passenger record built from the standardizer outputs and the
+form answers. Carries field provenance and is serialized once when persisted.
+"""
+
+# ==== Standard Library ====
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+def dumps(data):
+    """Serialize to JSON bytes (orjson when installed, stdlib json otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+class FieldSource:
+    __slots__ = ("document", "confidence")
+
+    def __init__(self, document, confidence=None):
+        self.document = document
+        self.confidence = confidence
+
+    def to_dict(self):
+        return {"document": self.document, "confidence": self.confidence}
+
+
+class PassengerRecord:
+    # Fields produced by DataStandardizer (passport + boarding pass) and the core form fields.
+    FIELDS = (
+        "surname", "given_names", "nationality", "date_of_birth", "gender", "passport_number",
+        "airline", "flight_number", "passenger_name", "from_origin", "to_destination", "departure_date",
+        "phone", "email", "confirmation_number",
+    )
+    __slots__ = FIELDS + ("extras", "provenance")
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        self.extras = {}       # remaining form answers (declarations, signature, ...)
+        self.provenance = {}   # field -> FieldSource
+        if fields:
+            self.update(fields, source="init")
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extras.get(key, default)
+
+    def set(self, key, value, source, confidence=None):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            self.extras[key] = value
+        self.provenance[key] = FieldSource(source, confidence)
+
+    def update(self, data, source, confidence=None):
+        """
+        Merge a dict into the record (later documents overwrite earlier ones).
+        Missing (None) values never erase a value already found, and unchanged values keep
+        their original provenance. confidence may be a number or a per-field dict.
+        """
+        for key, value in (data or {}).items():
+            if value is None or self.get(key) == value:
+                continue
+            field_conf = confidence.get(key) if isinstance(confidence, dict) else confidence
+            self.set(key, value, source, field_conf)
+        return self
+
+    def full_name(self):
+        return f"{self.given_names or ''} {self.surname or ''}".strip()
+
+    def to_dict(self, include_provenance=False):
+        out = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        out.update(self.extras)
+        if include_provenance:
+            out["provenance"] = {k: v.to_dict() for k, v in self.provenance.items()}
+        return out
+
+    def to_json(self, include_provenance=False):
+        return dumps(self.to_dict(include_provenance))
+
+    def save_json(self, path, include_provenance=False):
+        with open(path, "wb") as f:
+            f.write(self.to_json(include_provenance))
+        print(f"Saved locally: {path}")
+        return path
@@ -0,0 +1,202 @@
+"""
+referenceData.py
+----------------
+Bundled reference tables (ISO 3166 countries, IATA airports, airlines) with
+symmetric-delete indexes for OCR-tolerant fuzzy lookup.
+"""
+
+# ==== Standard Library ====
+
+import os
+import re
+import csv
+from functools import lru_cache
+
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference")
+
+# Characters Tesseract commonly confuses in upper-case codes
+OCR_DIGIT_TO_LETTER = str.maketrans({"0": "O", "1": "I", "2": "Z", "5": "S", "6": "G", "8": "B"})
+
+
+def normalize_term(text):
+    """Upper-case, drop punctuation, collapse whitespace."""
+    text = re.sub(r"[^A-Z0-9 ]", " ", (text or "").upper())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _deletes(term, max_distance):
+    """All strings reachable from term by deleting up to max_distance characters."""
+    results = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for word in frontier:
+            if len(word) <= 1:
+                continue
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def _edit_distance(a, b, max_distance):
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def allowed_distance(term, max_distance):
+    """Short terms must match exactly; longer ones tolerate more OCR noise."""
+    if len(term) < 6:
+        return 0
+    if len(term) < 10:
+        return min(1, max_distance)
+    return max_distance
+
+
+class SymmetricDeleteIndex:
+    """
+    Symmetric-delete dictionary (as in SymSpell): every term is stored under all of
+    its deletes, so a lookup only has to generate the deletes of the query.
+    """
+
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self.terms = {}      # normalized term -> value
+        self.deletes = {}    # delete -> list of normalized terms
+
+    def add(self, term, value):
+        term = normalize_term(term)
+        if not term or term in self.terms:
+            return
+        self.terms[term] = value
+        for d in _deletes(term, self.max_distance):
+            self.deletes.setdefault(d, []).append(term)
+
+    def lookup(self, query, max_distance=None):
+        """Return (value, matched_term, distance) for the closest term, or None."""
+        query = normalize_term(query)
+        if not query:
+            return None
+        if query in self.terms:
+            return self.terms[query], query, 0
+        if max_distance is None:
+            max_distance = allowed_distance(query, self.max_distance)
+        max_distance = min(max_distance, self.max_distance)
+        if max_distance == 0:
+            return None
+
+        best = None
+        seen = set()
+        for d in _deletes(query, max_distance):
+            for term in self.deletes.get(d, ()):
+                if term in seen:
+                    continue
+                seen.add(term)
+                dist = _edit_distance(query, term, max_distance)
+                if dist <= max_distance and (best is None or dist < best[2]):
+                    best = (self.terms[term], term, dist)
+        return best
+
+    def search_text(self, text, max_words=5):
+        """Best match over every run of up to max_words consecutive words in text."""
+        words = normalize_term(text).split()
+        best = None
+        for n in range(min(max_words, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                hit = self.lookup(" ".join(words[i:i + n]))
+                if hit and (best is None or hit[2] < best[2]):
+                    best = hit
+                    if best[2] == 0:
+                        return best
+        return best
+
+
+def _read_table(filename):
+    with open(os.path.join(REFERENCE_DIR, filename), newline="") as f:
+        return list(csv.DictReader(f))
+
+
+class ReferenceData:
+    def __init__(self, max_distance=2):
+        self.countries = {}   # alpha3 -> row
+        self.airports = {}    # iata -> row
+        self.airlines = {}    # iata -> row
+        self.country_index = SymmetricDeleteIndex(max_distance)
+        self.airline_index = SymmetricDeleteIndex(max_distance)
+        # Free text (a line that is not known to name the airline): no single-word aliases,
+        # which collide with names and words (ANA, LOT, SAS, TAP, DELTA, UNITED)
+        self.airline_text_index = SymmetricDeleteIndex(max_distance)
+
+        for row in _read_table("countries.csv"):
+            self.countries[row["alpha3"]] = row
+            self.country_index.add(row["name"], row["alpha3"])
+            for alias in filter(None, row["aliases"].split("|")):
+                self.country_index.add(alias, row["alpha3"])
+        for row in _read_table("airports.csv"):
+            self.airports[row["iata"]] = row
+        for row in _read_table("airlines.csv"):
+            self.airlines[row["iata"]] = row
+            self.airline_index.add(row["name"], row["iata"])
+            self.airline_text_index.add(row["name"], row["iata"])
+            for alias in filter(None, row["aliases"].split("|")):
+                self.airline_index.add(alias, row["iata"])
+                if " " in alias.strip():
+                    self.airline_text_index.add(alias, row["iata"])
+
+    def match_country(self, text, exact=False):
+        """
+        Canonical country name for a nationality string or alpha-3 code, else None.
+        exact: the whole text must be a country name, alias or code (for unlabelled lines).
+        """
+        code = normalize_term(text).translate(OCR_DIGIT_TO_LETTER)
+        if code in self.countries:
+            return self.countries[code]["name"]
+        if exact:
+            hit = self.country_index.lookup(text, max_distance=0)
+        else:
+            hit = self.country_index.search_text(text)
+        return self.countries[hit[0]]["name"] if hit else None
+
+    def match_airline(self, text, free_text=False):
+        """
+        Canonical airline name found in a line of text, else None.
+        free_text: the line is not known to be the airline line; single-word aliases are ignored.
+        """
+        index = self.airline_text_index if free_text else self.airline_index
+        hit = index.search_text(text)
+        return self.airlines[hit[0]]["name"] if hit else None
+
+    def airline_from_flight(self, flight_number):
+        """Airline name from the carrier prefix of a flight number (e.g. BA178)."""
+        m = re.match(r"^([A-Z0-9]{2})\d", flight_number or "")
+        if m and m.group(1) in self.airlines:
+            return self.airlines[m.group(1)]["name"]
+        return None
+
+    def match_airport(self, token):
+        """Known IATA airport code for a 3-character token (OCR digits repaired), else None."""
+        code = normalize_term(token).replace(" ", "").translate(OCR_DIGIT_TO_LETTER)
+        return code if code in self.airports else None
+
+
+@lru_cache(maxsize=1)
+def get_reference_data():
+    """Load the bundled tables and build the indexes once per process."""
+    return ReferenceData()
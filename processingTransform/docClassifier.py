@@ -0,0 +1,135 @@
+"""
+docClassifier.py
+----------------
+Cheap pre-OCR document classifier (passport vs boarding pass) so captures can be
+taken in any order and routed to the right standardizer. It works on the raw
+(colour or grey) frame, downscaled: the binarized guide-box crop has the guide
+box's fixed shape and has lost the document edges.
+"""
+
+# ==== Standard Library ====
+
+import cv2
+import numpy as np
+
+PASSPORT = "passport"
+BOARDING_PASS = "boarding_pass"
+
+
+class DocumentClassifier:
+    def __init__(self, width=640, min_margin=1.0):
+        self.width = width            # frames are downscaled to this width before analysis
+        self.min_margin = min_margin  # score gap required to commit to a type
+
+    def _prepare(self, image):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        h, w = image.shape[:2]
+        if w > self.width:
+            image = cv2.resize(image, (self.width, int(h * self.width / w)), interpolation=cv2.INTER_AREA)
+        return image
+
+    def document_box(self, gray):
+        """Bounding box (x, y, w, h) of the largest document-like contour, or None if there is none."""
+        h, w = gray.shape
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(blurred, 50, 150)
+        edges = cv2.dilate(edges, np.ones((5, 5), np.uint8))
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if contours:
+            x, y, cw, ch = cv2.boundingRect(max(contours, key=cv2.contourArea))
+            if cw * ch > 0.25 * w * h:
+                return x, y, cw, ch
+        return None
+
+    def document_aspect(self, gray):
+        """Width/height of the largest document-like contour, or None if there is none."""
+        box = self.document_box(gray)
+        return box[2] / float(box[3]) if box else None
+
+    def find_mrz(self, gray, region=None):
+        """
+        Bounding box of a machine-readable-zone band in the lower half of region (x, y, w, h:
+        the document, default the whole image), or None.
+        """
+        rx, ry, rw, rh = region or (0, 0, gray.shape[1], gray.shape[0])
+        rect_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (13, 5))
+        sq_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (21, 21))
+        blackhat = cv2.morphologyEx(cv2.GaussianBlur(gray, (3, 3), 0), cv2.MORPH_BLACKHAT, rect_kernel)
+        grad = np.absolute(cv2.Sobel(blackhat, cv2.CV_32F, 1, 0, ksize=-1))
+        grad = (255 * (grad - grad.min()) / max(grad.max() - grad.min(), 1e-6)).astype(np.uint8)
+        grad = cv2.morphologyEx(grad, cv2.MORPH_CLOSE, rect_kernel)
+        _, thresh = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, sq_kernel)
+        thresh = cv2.erode(thresh, None, iterations=2)
+
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for c in sorted(contours, key=cv2.contourArea, reverse=True):
+            x, y, cw, ch = cv2.boundingRect(c)
+            if cw / float(ch) > 5 and cw > 0.6 * rw and y > ry + 0.5 * rh:
+                return x, y, cw, ch
+        return None
+
+    def find_barcode(self, gray, exclude=None):
+        """Bounding box of a dense 1D/2D barcode region (PDF417, Aztec, QR), or None."""
+        h, w = gray.shape
+        grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=-1)
+        grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=-1)
+        grad = cv2.convertScaleAbs(cv2.subtract(np.absolute(grad_x), np.absolute(grad_y)))
+        grad = cv2.blur(grad, (9, 9))
+        _, thresh = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (21, 7)))
+        thresh = cv2.dilate(cv2.erode(thresh, None, iterations=4), None, iterations=4)
+
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for c in sorted(contours, key=cv2.contourArea, reverse=True):
+            x, y, cw, ch = cv2.boundingRect(c)
+            if cw * ch < 0.02 * w * h:
+                break
+            if exclude is not None:
+                ex, ey, ew, eh = exclude
+                if x < ex + ew and ex < x + cw and y < ey + eh and ey < y + ch:
+                    continue  # the MRZ band, not a barcode
+            # Barcodes fill their bounding box densely, text blocks do not
+            fill = cv2.contourArea(c) / float(cw * ch)
+            if fill > 0.7:
+                return x, y, cw, ch
+        return None
+
+    def features(self, image, roi=None):
+        """roi: guide box (x1, y1, x2, y2) as fractions of the frame, used when no document outline is found."""
+        gray = self._prepare(image)
+        h, w = gray.shape
+        box = self.document_box(gray)
+        # MRZ width and position are judged against the document, not the whole camera frame
+        region = box
+        if region is None and roi is not None:
+            x1, y1, x2, y2 = int(roi[0] * w), int(roi[1] * h), int(roi[2] * w), int(roi[3] * h)
+            region = (x1, y1, x2 - x1, y2 - y1)
+        mrz = self.find_mrz(gray, region)
+        barcode = self.find_barcode(gray, exclude=mrz)
+        return {
+            "aspect": box[2] / float(box[3]) if box else None,
+            "mrz": mrz is not None,
+            "barcode": barcode is not None,
+        }
+
+    def classify(self, image, roi=None):
+        """
+        image: the captured frame (not the binarized crop); roi: the guide box it was captured in.
+        Returns (doc_type or None, features).
+        """
+        f = self.features(image, roi)
+        aspect = f["aspect"]
+        # No document outline found: the shape abstains, MRZ/barcode alone decide
+        passport_shape = aspect is not None and 1.2 <= aspect <= 1.6
+        # Printed passes are wide strips; mobile passes are tall phone screens
+        boarding_shape = aspect is not None and (aspect >= 1.8 or aspect <= 0.8)
+        passport_score = 2.0 * f["mrz"] + (1.0 if passport_shape else 0.0)
+        boarding_score = 2.0 * f["barcode"] + (1.0 if boarding_shape else 0.0)
+        f["scores"] = {PASSPORT: passport_score, BOARDING_PASS: boarding_score}
+        if passport_score - boarding_score >= self.min_margin:
+            return PASSPORT, f
+        if boarding_score - passport_score >= self.min_margin:
+            return BOARDING_PASS, f
+        return None, f
@@ -0,0 +1,55 @@
+"""
+layoutTemplates.py
+------------------
+Document layout templates: named field regions (relative to the document crop)
+with the Tesseract page-segmentation mode and character whitelist that suit
+each field. Used by FieldOCRExtractor to OCR small crops concurrently. Only the
+passport data page has a template; other documents are OCR'd whole.
+"""
+
+# ==== Standard Library ====
+
+UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS = "0123456789"
+
+# Tesseract PSM values used below
+PSM_BLOCK = 6        # uniform block of text
+PSM_LINE = 7         # single text line
+
+LAYOUT_TEMPLATES = {}
+
+
+def register_template(doc_type, regions):
+    """
+    Register (or replace) the layout for a document type.
+    regions: {field: {"box": (x1, y1, x2, y2) as fractions of the crop, "psm": int, "whitelist": str|None}}
+    """
+    for name, region in regions.items():
+        x1, y1, x2, y2 = region["box"]
+        if not (0 <= x1 < x2 <= 1 and 0 <= y1 < y2 <= 1):
+            raise ValueError(f"Invalid box for {doc_type}.{name}: {region['box']}")
+    LAYOUT_TEMPLATES[doc_type] = dict(regions)
+
+
+def get_template(doc_type):
+    return LAYOUT_TEMPLATES.get(doc_type)
+
+
+# ICAO 9303 TD3 passport data page (photo on the left, MRZ across the bottom).
+# Boxes cover the printed value only (the small caption above it is left out), so each
+# value is one line (PSM 7) and can take a whitelist; a caption would be forced into it.
+NAME_CHARS = UPPER + "-"   # no quote: pytesseract splits its config shell-style
+register_template("passport", {
+    "passport_number": {"box": (0.68, 0.10, 0.98, 0.16), "psm": PSM_LINE, "whitelist": UPPER + DIGITS},
+    "surname":         {"box": (0.30, 0.22, 0.98, 0.28), "psm": PSM_LINE, "whitelist": NAME_CHARS},
+    "given_names":     {"box": (0.30, 0.32, 0.98, 0.38), "psm": PSM_LINE, "whitelist": NAME_CHARS},
+    "nationality":     {"box": (0.30, 0.42, 0.98, 0.48), "psm": PSM_LINE, "whitelist": UPPER},
+    "date_of_birth":   {"box": (0.30, 0.52, 0.70, 0.58), "psm": PSM_LINE, "whitelist": UPPER + DIGITS},
+    "gender":          {"box": (0.30, 0.62, 0.50, 0.68), "psm": PSM_LINE, "whitelist": "MFX<"},
+    # Two 44-character lines
+    "mrz":             {"box": (0.00, 0.76, 1.00, 1.00), "psm": PSM_BLOCK, "whitelist": UPPER + DIGITS + "<"},
+})
+
+# No boarding pass template: airline layouts vary too much for fixed boxes, and only
+# passport fields have a per-field standardizer (standardize_passport_fields).
+# Boarding passes are OCR'd whole and parsed from the text.
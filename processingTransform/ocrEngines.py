@@ -0,0 +1,148 @@
+"""
+ocrEngines.py
+-------------
+Pluggable OCR engines behind one interface. Every engine returns
+(text, confidence) per image, with confidence in [0, 1] or None:
+
+    engine.recognize(image, psm=None, whitelist=None)
+    engine.recognize_batch(images, regions=None, max_workers=None)
+
+Engines are created once per process (get_engine), so model weights are
+loaded a single time. Selection per document type comes from config.
+"""
+
+# ==== Standard Library ====
+
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class OCREngine(ABC):
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, image, psm=None, whitelist=None):
+        """Return (text, confidence) for one image."""
+
+    def recognize_batch(self, images, regions=None, max_workers=None):
+        """Default: one image at a time. regions gives each image's {"psm", "whitelist"}."""
+        regions = regions or [{}] * len(images)
+        return [self.recognize(img, r.get("psm"), r.get("whitelist")) for img, r in zip(images, regions)]
+
+
+class TesseractEngine(OCREngine):
+    name = "tesseract"
+
+    def __init__(self):
+        import pytesseract
+        self.pytesseract = pytesseract
+
+    def recognize(self, image, psm=None, whitelist=None):
+        config = f"--psm {psm}" if psm else ""
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        # image_to_data gives words with confidences in the same single pass as image_to_string
+        data = self.pytesseract.image_to_data(image, config=config.strip(), output_type=self.pytesseract.Output.DICT)
+        lines, confs = {}, []
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if not word.strip() or conf < 0:
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(word)
+            confs.append(conf)
+        text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+        return text, (sum(confs) / len(confs) / 100.0 if confs else None)
+
+    def recognize_batch(self, images, regions=None, max_workers=None):
+        # Each pytesseract call is its own process, so threads run crops on separate cores
+        regions = regions or [{}] * len(images)
+        with ThreadPoolExecutor(max_workers=max_workers or len(images) or 1) as pool:
+            return list(pool.map(lambda ir: self.recognize(ir[0], ir[1].get("psm"), ir[1].get("whitelist")),
+                                 zip(images, regions)))
+
+
+class EasyOCREngine(OCREngine):
+    name = "easyocr"
+
+    def __init__(self, langs=("en",), batch_size=8):
+        import easyocr  # optional dependency, only needed when this engine is selected
+        self.reader = easyocr.Reader(list(langs), gpu=False)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()  # the torch model is shared; serialize inference calls
+
+    @staticmethod
+    def _to_result(detections):
+        if not detections:
+            return "", None
+        # detections: [(box, text, confidence)], top-to-bottom then left-to-right
+        detections = sorted(detections, key=lambda d: (round(d[0][0][1] / 10), d[0][0][0]))
+        text = "\n".join(d[1] for d in detections)
+        return text, float(sum(d[2] for d in detections) / len(detections))
+
+    def recognize(self, image, psm=None, whitelist=None):
+        with self._lock:
+            detections = self.reader.readtext(image, allowlist=whitelist)
+        return self._to_result(detections)
+
+    @staticmethod
+    def _pad_to(images, height, width):
+        """Pad crops with white to one size so they can share a batch (no resizing distortion)."""
+        padded = []
+        for img in images:
+            canvas = np.full((height, width) + img.shape[2:], 255, dtype=img.dtype)
+            canvas[:img.shape[0], :img.shape[1]] = img
+            padded.append(canvas)
+        return padded
+
+    def recognize_batch(self, images, regions=None, max_workers=None):
+        if not images:
+            return []
+        # Whitelists differ per region, so only batch together crops sharing one
+        regions = regions or [{}] * len(images)
+        results = [None] * len(images)
+        groups = {}
+        for i, r in enumerate(regions):
+            groups.setdefault(r.get("whitelist"), []).append(i)
+        for whitelist, idxs in groups.items():
+            crops = [images[i] for i in idxs]
+            height = max(c.shape[0] for c in crops)
+            width = max(c.shape[1] for c in crops)
+            with self._lock:
+                batched = self.reader.readtext_batched(
+                    self._pad_to(crops, height, width), batch_size=self.batch_size, allowlist=whitelist)
+            for i, detections in zip(idxs, batched):
+                results[i] = self._to_result(detections)
+        return results
+
+
+ENGINES = {
+    "tesseract": TesseractEngine,
+    "easyocr": EasyOCREngine,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_engine(name="tesseract"):
+    """Shared engine instance (model loaded once per process)."""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name} (expected one of {sorted(ENGINES)})")
+    with _instances_lock:
+        if name not in _instances:
+            if name == "easyocr":
+                from config.config import EASYOCR_LANGS, EASYOCR_BATCH_SIZE
+                _instances[name] = EasyOCREngine(EASYOCR_LANGS, EASYOCR_BATCH_SIZE)
+            else:
+                _instances[name] = ENGINES[name]()
+        return _instances[name]
+
+
+def engine_for(doc_type):
+    """Engine configured for a document type (ocr.engines in settings.yaml), tesseract by default."""
+    from config.config import OCR_ENGINES
+    return get_engine(OCR_ENGINES.get(doc_type, "tesseract"))
@@ -0,0 +1,131 @@
+"""
+pdfExtract.py
+-------------
+Reads PDF documents (mobile / print-at-home boarding passes) from their
+embedded text layer, with line positions, instead of photographing them.
+Pages without a usable text layer (scans, flattened images) are rasterized
+and sent to the OCR engine. iter_pages() loads, rasterizes and yields one
+page at a time; extract() folds pages into one result as they arrive and,
+given done(), stops reading once the text so far is enough.
+
+Returns the same shape as OCRExtractor ({"text", "confidence", "engine"})
+plus per-page detail, so the result goes straight into DataStandardizer.
+"""
+
+# ==== Standard Library ====
+
+import os
+import json
+
+import cv2
+import numpy as np
+
+from processingTransform.ocrEngines import get_engine
+
+TEXT_LAYER = "pdf_text"
+
+
+class PDFTextExtractor:
+    def __init__(self, pdf_path=None, engine=None, dpi=300, min_chars=20, max_pages=None):
+        """
+        min_chars: a page with fewer extractable characters is treated as image-only and OCR'd.
+        max_pages: stop after this many pages (None = all).
+        """
+        import fitz  # PyMuPDF, optional dependency, only needed for PDF input
+        self.fitz = fitz
+        self.pdf_path = pdf_path
+        self.engine = engine
+        self.dpi = dpi
+        self.min_chars = min_chars
+        self.max_pages = max_pages
+
+    def _text_layer(self, page):
+        """Lines of the text layer in reading order (top-to-bottom, left-to-right) with their boxes."""
+        lines = []
+        for block in page.get_text("dict", sort=True)["blocks"]:
+            if block.get("type") != 0:   # 0 = text, 1 = image
+                continue
+            for line in block["lines"]:
+                text = " ".join(span["text"].strip() for span in line["spans"] if span["text"].strip())
+                if text:
+                    lines.append({"text": text, "bbox": [round(v, 1) for v in line["bbox"]]})
+        return lines
+
+    def _rasterize(self, page, dpi=None):
+        pix = page.get_pixmap(dpi=dpi or self.dpi, colorspace=self.fitz.csGRAY, alpha=False)
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width].copy()
+
+    def render_page(self, pdf_path=None, number=0, dpi=None):
+        """One page as a grayscale image (e.g. for the document classifier)."""
+        doc = self.fitz.open(pdf_path or self.pdf_path)
+        try:
+            return self._rasterize(doc.load_page(number), dpi)
+        finally:
+            doc.close()
+
+    def _ocr_page(self, page):
+        """Rasterize one page (grayscale, Otsu binarized like the camera path) and OCR it."""
+        gray = self._rasterize(page)
+        _, binarized = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        engine = self.engine or get_engine("tesseract")
+        text, confidence = engine.recognize(binarized)
+        return text, confidence, engine.name
+
+    def iter_pages(self, pdf_path=None):
+        """Yield one result dict per page as it is read; only the current page is held in memory."""
+        pdf_path = pdf_path or self.pdf_path
+        doc = self.fitz.open(pdf_path)
+        try:
+            for number in range(doc.page_count):
+                if self.max_pages is not None and number >= self.max_pages:
+                    break
+                page = doc.load_page(number)
+                lines = self._text_layer(page)
+                if sum(len(l["text"]) for l in lines) >= self.min_chars:
+                    yield {"page": number + 1, "source": TEXT_LAYER, "confidence": 1.0,
+                           "text": "\n".join(l["text"] for l in lines), "lines": lines}
+                else:
+                    text, confidence, engine_name = self._ocr_page(page)
+                    yield {"page": number + 1, "source": engine_name, "confidence": confidence,
+                           "text": text, "lines": []}
+        finally:
+            doc.close()
+
+    def extract(self, pdf_path=None, save_json_path=None, done=None):
+        """
+        done: optional callable on the text read so far; when it returns True no further
+        page is loaded (e.g. a boarding pass whose first page has every field).
+        """
+        pdf_path = pdf_path or self.pdf_path
+        if not pdf_path or not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"Cannot load PDF: {pdf_path}")
+
+        # 1. Text layer (or OCR fallback) page by page, until done
+        pages, texts = [], []
+        pages_iter = self.iter_pages(pdf_path)
+        try:
+            for page in pages_iter:
+                pages.append(page)
+                if page["text"]:
+                    texts.append(page["text"])
+                if done is not None and done("\n".join(texts)):
+                    break
+        finally:
+            pages_iter.close()   # closes the document even when stopping early
+        confs = [p["confidence"] for p in pages if p["confidence"] is not None]
+        sources = sorted({p["source"] for p in pages})
+        result = {
+            "text": "\n".join(texts),
+            "confidence": sum(confs) / len(confs) if confs else None,
+            "engine": "+".join(sources) or TEXT_LAYER,
+            "pages": pages,
+        }
+
+        # 2. Save next to the PDF like the image OCR output
+        save_path = save_json_path or os.path.splitext(pdf_path)[0] + "-ocr_raw.json"
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"PDF text output saved as {save_path}")
+
+        return result
@@ -0,0 +1,134 @@
+"""
+agencyClient.py
+---------------
+HTTP client for the agency declarations API: a small pool of keep-alive
+connections (no TCP/TLS handshake per request) and one batch call per
+micro-batch.
+
+API (also implemented by submitLoad/agencyStub.py):
+    POST /declarations/batch
+        Idempotency-Key: <hash of the batch's confirmation numbers>
+        {"declarations": [{"idempotency_key": "<confirmation_number>", "declaration": {...}}]}
+    200 {"results": [{"idempotency_key": ..., "status": "accepted" | "duplicate" | "rejected" | "retry",
+                      "error": ...}]}
+    429 / 5xx (optionally Retry-After): retry the whole batch later
+"""
+
+# ==== Standard Library ====
+
+import json
+import queue
+import hashlib
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+BATCH_PATH = "/declarations/batch"
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504)
+
+
+class AgencyError(Exception):
+    """The agency refused the request outright (not worth retrying as-is)."""
+
+
+class RetryableAgencyError(AgencyError):
+    """Transient failure (connection, timeout, 429/5xx); retry_after in seconds if the server said so."""
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def batch_idempotency_key(keys):
+    return hashlib.sha256("\n".join(sorted(keys)).encode("utf-8")).hexdigest()
+
+
+class AgencyClient:
+    def __init__(self, endpoint, pool_size=4, timeout=10.0, token=None):
+        url = urlsplit(endpoint)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported agency endpoint: {endpoint}")
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self._idle = queue.LifoQueue()                   # most recently used first: warmest connection
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.connections_opened = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, conn, reusable):
+        if reusable:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def post_json(self, path, body, headers=None):
+        """POST JSON over a pooled keep-alive connection; returns (status, headers, parsed body)."""
+        data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        headers = dict(headers or {})
+        headers.update({"Content-Type": "application/json", "Content-Length": str(len(data))})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        conn = self._acquire()
+        reusable = False
+        try:
+            try:
+                conn.request("POST", self.base_path + path, body=data, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                # Includes a keep-alive connection the server closed while idle
+                raise RetryableAgencyError(f"{type(e).__name__}: {e}") from e
+            reusable = not resp.will_close
+            with self._lock:
+                self.requests += 1
+            try:
+                parsed = json.loads(raw) if raw else None
+            except ValueError:
+                parsed = None
+            return resp.status, dict(resp.getheaders()), parsed
+        finally:
+            self._release(conn, reusable)
+
+    def send_batch(self, items):
+        """
+        items: [(confirmation_number, declaration)]. Returns {confirmation_number: (status, error)}.
+        Raises RetryableAgencyError for transient failures, AgencyError for a refused batch.
+        """
+        keys = [key for key, _ in items]
+        body = {"declarations": [{"idempotency_key": key, "declaration": decl} for key, decl in items]}
+        status, headers, parsed = self.post_json(
+            BATCH_PATH, body, {"Idempotency-Key": batch_idempotency_key(keys)})
+        if status in RETRYABLE_STATUS:
+            retry_after = headers.get("Retry-After")
+            raise RetryableAgencyError(
+                f"HTTP {status}", float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if status != 200 or not isinstance(parsed, dict) or "results" not in parsed:
+            raise AgencyError(f"HTTP {status}: {parsed}")
+        results = {r["idempotency_key"]: (r.get("status"), r.get("error")) for r in parsed["results"]}
+        # Anything the agency did not report on is retried
+        return {key: results.get(key, ("retry", "missing from response")) for key in keys}
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,209 @@
+"""
+agencyStub.py
+-------------
+Local stand-in for the agency declarations API (same contract as
+agencyClient.py), with knobs for the failure modes the real link has:
+latency, 503s with Retry-After, dropped connections and per-item
+rejections. It honours idempotency keys, so duplicates are reported, never
+stored twice.
+
+Serve it:
+    python -m submitLoad.agencyStub --port 8765 --fail-rate 0.05
+Or measure throughput offline (stub + outbox + SubmissionHandler in-process):
+    python -m submitLoad.agencyStub --bench 5000 --producers 8 --max-batch 50 --fail-rate 0.1
+"""
+
+# ==== Standard Library ====
+
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from submitLoad.agencyClient import AgencyClient, BATCH_PATH
+from submitLoad.outbox import SubmissionOutbox
+from submitLoad.submit import SubmissionHandler
+
+
+class AgencyStub:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, per_item_latency=0.0,
+                 fail_rate=0.0, drop_rate=0.0, reject_rate=0.0, retry_after=1):
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+        self.fail_rate = fail_rate          # whole batch answered 503
+        self.drop_rate = drop_rate          # connection closed without a response
+        self.reject_rate = reject_rate      # single declarations rejected as invalid
+        self.retry_after = retry_after
+        self.accepted = {}                  # idempotency key -> declaration
+        self.counts = {"requests": 0, "connections": 0, "items": 0, "accepted": 0,
+                       "duplicates": 0, "rejected": 0, "failed": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+
+            def setup(self):
+                super().setup()
+                stub._count("connections")
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    with stub._lock:
+                        self._reply(200, dict(stub.counts, stored=len(stub.accepted)))
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub._count("requests")
+                if self.path != BATCH_PATH:
+                    self._reply(404, {"error": "not found"})
+                    return
+                if random.random() < stub.drop_rate:
+                    stub._count("dropped")
+                    self.close_connection = True
+                    return
+                try:
+                    items = json.loads(body)["declarations"]
+                except (ValueError, KeyError, TypeError):
+                    self._reply(400, {"error": "malformed batch"})
+                    return
+                time.sleep(stub.latency + stub.per_item_latency * len(items))
+                if random.random() < stub.fail_rate:
+                    stub._count("failed")
+                    self._reply(503, {"error": "unavailable"}, {"Retry-After": str(stub.retry_after)})
+                    return
+                results = []
+                with stub._lock:
+                    for item in items:
+                        key = item.get("idempotency_key")
+                        stub.counts["items"] += 1
+                        if not key or not isinstance(item.get("declaration"), dict):
+                            status, error = "rejected", "missing idempotency_key or declaration"
+                        elif key in stub.accepted:
+                            status, error = "duplicate", None
+                        elif random.random() < stub.reject_rate:
+                            status, error = "rejected", "validation failed"
+                        else:
+                            stub.accepted[key] = item["declaration"]
+                            status, error = "accepted", None
+                        stub.counts[status if status != "duplicate" else "duplicates"] += 1
+                        results.append({"idempotency_key": key, "status": status, "error": error})
+                self._reply(200, {"results": results})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="agency-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench(args):
+    stub = AgencyStub(latency=args.latency, per_item_latency=args.per_item_latency, fail_rate=args.fail_rate,
+                      drop_rate=args.drop_rate, reject_rate=args.reject_rate, retry_after=0).start()
+    client = AgencyClient(stub.url, pool_size=args.pool_size)
+    with tempfile.TemporaryDirectory() as folder:
+        handler = SubmissionHandler(SubmissionOutbox(folder), client, max_batch=args.max_batch,
+                                    max_wait=args.max_wait, senders=args.pool_size, backoff=0.05,
+                                    max_backoff=1.0).start()
+        per_producer = args.bench // args.producers
+
+        def produce(p):
+            for i in range(per_producer):
+                handler.submit({"confirmation_number": f"BENCH-{p:03d}-{i:06d}", "surname": "TEST"})
+                if args.dup_rate and random.random() < args.dup_rate:
+                    handler.submit({"confirmation_number": f"BENCH-{p:03d}-{i:06d}", "surname": "TEST"})
+
+        start = time.perf_counter()
+        producers = [threading.Thread(target=produce, args=(p,)) for p in range(args.producers)]
+        for t in producers:
+            t.start()
+        for t in producers:
+            t.join()
+        submitted_in = time.perf_counter() - start
+        while handler.metrics()["pending"] or handler.metrics()["in_flight"]:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        m = handler.metrics()
+        handler.stop()
+    client.close()
+    stub.stop()
+
+    total = per_producer * args.producers
+    print(f"\nDeclarations: {total}  producers: {args.producers}  max_batch: {args.max_batch}  "
+          f"max_wait: {args.max_wait}s  pool: {args.pool_size}")
+    print(f"Enqueued in {submitted_in:.2f}s; delivered in {elapsed:.2f}s: {total / elapsed:.0f} declarations/s")
+    print(f"Handler: {m}")
+    print(f"Client:  requests={client.requests} connections_opened={client.connections_opened}")
+    print(f"Stub:    {stub.counts} stored={len(stub.accepted)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local agency API stub / submission throughput bench")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    parser.add_argument("--per-item-latency", type=float, default=0.0005, help="seconds per declaration")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of batches answered 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections dropped")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fraction of declarations rejected")
+    parser.add_argument("--bench", type=int, default=0, help="run N declarations through an in-process stub")
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--dup-rate", type=float, default=0.0, help="fraction of declarations submitted twice")
+    parser.add_argument("--max-batch", type=int, default=50)
+    parser.add_argument("--max-wait", type=float, default=0.25)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args)
+        return
+    stub = AgencyStub(args.host, args.port, latency=args.latency, per_item_latency=args.per_item_latency,
+                      fail_rate=args.fail_rate, drop_rate=args.drop_rate, reject_rate=args.reject_rate)
+    print(f"Agency stub listening on {stub.url} (POST {BATCH_PATH}, GET /stats)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
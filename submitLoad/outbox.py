@@ -0,0 +1,128 @@
+"""
+outbox.py
+---------
+Durable outbox for agency submissions. A declaration is appended (and
+fsync'd) before submit() returns, and stays pending until the agency has
+acknowledged it, so nothing is lost to a crash, a reboot or a dead uplink.
+
+outbox.jsonl holds one JSON line per event:
+    {"op": "put",  "key": ..., "payload": {...}}
+    {"op": "done", "keys": [...]}
+    {"op": "dead", "key": ..., "error": ...}     (rejected by the agency; copied to dead.jsonl)
+
+Reopening replays the log and rewrites it with only the pending entries.
+"""
+
+# ==== Standard Library ====
+
+import os
+import json
+import threading
+from collections import OrderedDict
+
+OUTBOX_FILE = "outbox.jsonl"
+DEAD_FILE = "dead.jsonl"
+
+
+def get_outbox_dir(agency, country, state, airportcode, base_dir=None):
+    """Returns the local outbox directory, ensures directory exists."""
+    if base_dir is None:
+        from config.config import STORAGE_ROOT
+        base_dir = os.path.join(STORAGE_ROOT, "Outbox")
+    folder = os.path.join(base_dir, agency, country, state, airportcode)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+class SubmissionOutbox:
+    def __init__(self, folder, compact_bytes=4 * 1024 * 1024):
+        """compact_bytes: rewrite the log once it is this large and nothing is pending."""
+        self.folder = folder
+        self.path = os.path.join(folder, OUTBOX_FILE)
+        self.dead_path = os.path.join(folder, DEAD_FILE)
+        self.compact_bytes = compact_bytes
+        self.pending = OrderedDict()   # key -> payload, oldest first
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.path):
+            self._replay()
+        self._rewrite()
+        self._file = open(self.path, "a")
+
+    def _replay(self):
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn last line: that put never returned to its caller
+                if entry["op"] == "put":
+                    self.pending.setdefault(entry["key"], entry["payload"])
+                elif entry["op"] == "done":
+                    for key in entry["keys"]:
+                        self.pending.pop(key, None)
+                elif entry["op"] == "dead":
+                    self.pending.pop(entry["key"], None)
+
+    def _rewrite(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            for key, payload in self.pending.items():
+                f.write(json.dumps({"op": "put", "key": key, "payload": payload}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def put(self, key, payload):
+        """Durably enqueue; a key already pending is not queued twice. Returns True if added."""
+        with self._lock:
+            if key in self.pending:
+                return False
+            self._write({"op": "put", "key": key, "payload": payload})
+            self.pending[key] = payload
+            return True
+
+    def ack(self, keys):
+        """Mark delivered (accepted or already known to the agency)."""
+        with self._lock:
+            keys = [k for k in keys if k in self.pending]
+            if not keys:
+                return
+            self._write({"op": "done", "keys": keys})
+            for key in keys:
+                self.pending.pop(key, None)
+            if not self.pending and self._file.tell() > self.compact_bytes:
+                self._file.close()
+                self._rewrite()
+                self._file = open(self.path, "a")
+
+    def dead_letter(self, key, error):
+        """Permanently rejected: keep it for an operator in dead.jsonl and stop retrying."""
+        with self._lock:
+            payload = self.pending.pop(key, None)
+            with open(self.dead_path, "a") as f:
+                f.write(json.dumps({"key": key, "error": error, "payload": payload}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._write({"op": "dead", "key": key, "error": error})
+
+    def get(self, key):
+        with self._lock:
+            return self.pending.get(key)
+
+    def items(self):
+        with self._lock:
+            return list(self.pending.items())
+
+    def __len__(self):
+        return len(self.pending)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
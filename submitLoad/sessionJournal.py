@@ -0,0 +1,155 @@
+"""
+sessionJournal.py
+-----------------
+Append-only per-passenger session journal. Each completed workflow stage is
+written (and fsync'd) as one JSON line with the artifacts it produced, so a
+restarted workflow can resume from the last completed stage instead of
+recapturing, re-running OCR and re-uploading. Resuming needs the operator's
+confirmation and a recent journal; finished, declined and stale journals are
+deleted.
+"""
+
+# ==== Standard Library ====
+
+import os
+import json
+import glob
+import time
+import uuid
+import shutil
+from datetime import datetime
+
+COMPLETE = "session_complete"
+
+
+def get_journal_dir(agency, country, state, airportcode, base_dir=None):
+    """Returns the local directory for session journals, ensures directory exists."""
+    if base_dir is None:
+        from config.config import STORAGE_ROOT
+        base_dir = os.path.join(STORAGE_ROOT, "Sessions")
+    folder = os.path.join(base_dir, agency, country, state, airportcode)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+class SessionJournal:
+    def __init__(self, path):
+        self.path = path
+        self.session_id = os.path.splitext(os.path.basename(path))[0]
+        self.stages = {}   # stage -> payload, replayed from disk
+        if os.path.exists(path):
+            self._replay()
+        self._file = open(path, "a")
+
+    def _replay(self):
+        good = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-write: the stage did not complete
+                    break
+                self.stages[entry["stage"]] = entry.get("payload")
+                good += len(line)
+        # Cut the torn tail so the next record starts on a clean line
+        if os.path.getsize(self.path) > good:
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    @classmethod
+    def start(cls, journal_dir):
+        name = f"session_{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:8]}.jsonl"
+        return cls(os.path.join(journal_dir, name))
+
+    @staticmethod
+    def discard(path):
+        """Delete a journal and anything spooled next to it under its session id (e.g. a bundle spool)."""
+        session_id = os.path.splitext(os.path.basename(path))[0]
+        for leftover in glob.glob(os.path.join(os.path.dirname(path), session_id + "*")):
+            if os.path.isdir(leftover):
+                shutil.rmtree(leftover, ignore_errors=True)
+            else:
+                try:
+                    os.remove(leftover)
+                except FileNotFoundError:
+                    pass
+
+    @classmethod
+    def find_incomplete(cls, journal_dir, max_age_s=None):
+        """
+        The most recent journal if it never reached session_complete and was written to
+        within max_age_s, else None. Every other journal is deleted: completed ones are done,
+        older incomplete ones were superseded (a newer session means that passenger moved on)
+        and stale ones were abandoned. Journals hold passenger data, so none are kept.
+        """
+        paths = sorted(glob.glob(os.path.join(journal_dir, "session_*.jsonl")))
+        for path in paths[:-1]:
+            cls.discard(path)
+        if not paths:
+            return None
+        path = paths[-1]
+        if max_age_s is not None and time.time() - os.path.getmtime(path) > max_age_s:
+            print(f"Discarding stale session {os.path.splitext(os.path.basename(path))[0]}.")
+            cls.discard(path)
+            return None
+        journal = cls(path)
+        if journal.is_complete():
+            journal.close()
+            cls.discard(path)
+            return None
+        return journal
+
+    @classmethod
+    def resume_or_start(cls, journal_dir, responder=None, max_age_s=None):
+        """
+        Offer to resume the last interrupted session; the operator must confirm, since the
+        next person at the kiosk may not be the passenger who walked away. Declined sessions
+        are deleted.
+        """
+        journal = cls.find_incomplete(journal_dir, max_age_s)
+        if journal is not None:
+            if responder is None:
+                from formOpLoad.formOperations import ConsoleResponder
+                responder = ConsoleResponder()
+            started = journal.session_id.split("_", 1)[-1][:15]
+            answer = responder.ask("resume_session", (
+                f"Unfinished session from {started} (completed: {', '.join(journal.stages) or 'none'}). "
+                f"Resume it for the SAME passenger? (y/n): ")).strip().lower()
+            if answer.startswith("y"):
+                print(f"Resuming session {journal.session_id}")
+                return journal
+            journal.close()
+            cls.discard(journal.path)
+            print("Previous session discarded.")
+        return cls.start(journal_dir)
+
+    def completed(self, stage):
+        return stage in self.stages
+
+    def get(self, stage, default=None):
+        return self.stages.get(stage, default)
+
+    def record(self, stage, payload=None):
+        """Durably append a completed stage before the workflow moves on."""
+        entry = {"stage": stage, "time": datetime.now().isoformat(timespec="seconds"), "payload": payload}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.stages[stage] = payload
+        return payload
+
+    def is_complete(self):
+        return COMPLETE in self.stages
+
+    def complete(self, outcome="submitted"):
+        """Mark the session finished, then delete the journal (nothing left to resume)."""
+        self.record(COMPLETE, {"outcome": outcome})
+        self.close()
+        self.discard(self.path)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
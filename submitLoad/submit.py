@@ -2,14 +2,270 @@
 submit.py
 ---------
 Handles submission logic, data persistence, and transaction logs.
+
+SubmissionHandler forwards completed declarations to the agency API:
+submit() only appends to the durable outbox, and a background dispatcher
+micro-batches pending declarations (up to max_batch, or whatever arrived
+within max_wait seconds) onto a few pooled keep-alive connections. The
+confirmation number is the idempotency key, so retries and replays after a
+crash can never create duplicates at the agency. Transient failures are
+retried with capped exponential backoff and jitter; declarations the agency
+rejects are dead-lettered for an operator.
+
+Batching only pays off when the handler outlives a passenger: host one per
+process (lanes.LaneHost) via open_agency_submitter(). The single-passenger
+app.py run submits one declaration per process, so its batches are size 1.
 """
 
 # ==== Standard Library ====
 
+import time
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from submitLoad.agencyClient import AgencyClient, AgencyError, RetryableAgencyError
+from submitLoad.outbox import SubmissionOutbox, get_outbox_dir
+from utils import percentile
+
+
 class SubmissionHandler:
-    def __init__(self, db_conn):
-        self.db = db_conn
+    def __init__(self, outbox, client, max_batch=50, max_wait=0.25, senders=2,
+                 max_retries=6, backoff=0.5, max_backoff=30.0):
+        """
+        outbox: SubmissionOutbox; client: AgencyClient (anything with send_batch).
+        senders: batches in flight at once (keep <= the client's connection pool size).
+        max_retries: attempts before a batch the agency refuses outright is dead-lettered;
+        transient failures (network, 429, 5xx) are retried until the agency is back.
+        """
+        self.outbox = outbox
+        self.client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.senders = senders
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.ready = OrderedDict()     # key -> None, oldest first; not in flight
+        self.in_flight = set()
+        self.not_before = {}           # key -> monotonic time of the next attempt
+        self.attempts = {}             # key -> refused attempts so far (bounded by max_retries)
+        self.transient = {}            # key -> consecutive transient failures (drives backoff only)
+        self.enqueued_at = {}          # key -> monotonic submit time, for ack latency
+        self.cond = threading.Condition()
+        self.stats = {"submitted": 0, "acked": 0, "duplicates": 0, "dead": 0, "retries": 0,
+                      "batches": 0, "batched_items": 0}
+        self.latencies = deque(maxlen=2000)
+        self._executor = ThreadPoolExecutor(max_workers=senders, thread_name_prefix="agency")
+        self._slots = threading.BoundedSemaphore(senders)
+        self._thread = None
+        self._stopping = False
+        self._deadline = None
 
+        # Whatever a previous run left undelivered goes out first
+        now = time.monotonic()
+        for key, _ in outbox.items():
+            self.ready[key] = None
+            self.enqueued_at[key] = now
+
+    # ---- producer side ----
     def submit(self, form_data):
-        # Save form data to DB, trigger notifications, etc.
-        pass
+        """Durably queue one completed declaration; returns its idempotency key."""
+        key = form_data.get("confirmation_number")
+        if not key:
+            raise ValueError("Declaration has no confirmation_number")
+        added = self.outbox.put(key, form_data)
+        with self.cond:
+            if added:
+                self.ready[key] = None
+                self.enqueued_at[key] = time.monotonic()
+                self.stats["submitted"] += 1
+                self.cond.notify()
+        return key
+
+    # ---- dispatcher ----
+    def _due(self, now):
+        return [k for k in self.ready if self.not_before.get(k, 0) <= now]
+
+    def _next_due_in(self, now):
+        waits = [self.not_before[k] - now for k in self.ready if k in self.not_before]
+        return max(0.0, min(waits)) if waits else None
+
+    def _take(self, due):
+        batch = []
+        for key in due[:self.max_batch]:
+            del self.ready[key]
+            self.in_flight.add(key)
+            batch.append(key)
+        return batch
+
+    def _next_batch(self):
+        """Block until a batch is due: max_batch ready, or max_wait after the first one arrived."""
+        with self.cond:
+            window_start = None
+            while True:
+                now = time.monotonic()
+                due = self._due(now)
+                if self._stopping:
+                    # Draining: send what is due right away, wait only for in-flight results
+                    if due:
+                        return self._take(due)
+                    if not self.in_flight or now >= self._deadline:
+                        return None
+                    self.cond.wait(0.05)
+                    continue
+                if len(due) >= self.max_batch:
+                    return self._take(due)
+                if due:
+                    window_start = window_start or now
+                    remaining = window_start + self.max_wait - now
+                    if remaining <= 0:
+                        return self._take(due)
+                    self.cond.wait(remaining)
+                else:
+                    window_start = None
+                    self.cond.wait(self._next_due_in(now))
+
+    def _run(self):
+        while True:
+            self._slots.acquire()   # never more batches in flight than senders
+            batch = self._next_batch()
+            if batch is None:
+                self._slots.release()
+                return
+            self._executor.submit(self._send, batch)
+
+    def _delay(self, attempt, retry_after=None):
+        delay = min(self.max_backoff, self.backoff * 2 ** max(0, attempt - 1)) * random.uniform(0.5, 1.0)
+        return max(delay, retry_after or 0.0)
+
+    def _requeue(self, keys, delay):
+        with self.cond:
+            due = time.monotonic() + delay
+            for key in keys:
+                self.in_flight.discard(key)
+                self.ready[key] = None
+                self.not_before[key] = due
+            self.stats["retries"] += 1
+            self.cond.notify()
+
+    def _finish(self, keys, dead=False):
+        with self.cond:
+            now = time.monotonic()
+            for key in keys:
+                self.in_flight.discard(key)
+                self.not_before.pop(key, None)
+                self.attempts.pop(key, None)
+                self.transient.pop(key, None)
+                started = self.enqueued_at.pop(key, None)
+                if not dead and started is not None:
+                    self.latencies.append(now - started)
+            self.cond.notify()
+
+    def _send(self, keys):
+        try:
+            batch = [(key, self.outbox.get(key)) for key in keys]
+            with self.cond:
+                self.stats["batches"] += 1
+                self.stats["batched_items"] += len(batch)
+            try:
+                results = self.client.send_batch(batch)
+            except RetryableAgencyError as e:
+                with self.cond:
+                    attempt = max(self.transient.get(k, 0) for k in keys) + 1
+                    for key in keys:
+                        self.transient[key] = attempt
+                print(f"Agency submission deferred ({e}), {len(keys)} declaration(s) will be retried.")
+                self._requeue(keys, self._delay(attempt, e.retry_after))
+                return
+            except AgencyError as e:
+                results = {key: ("error", str(e)) for key in keys}
+
+            acked, dead, retry = [], [], []
+            with self.cond:
+                for key in keys:
+                    status, error = results.get(key, ("retry", None))
+                    if status in ("accepted", "duplicate"):
+                        acked.append(key)
+                        if status == "duplicate":
+                            self.stats["duplicates"] += 1
+                    elif status == "rejected":
+                        dead.append((key, error))
+                    else:
+                        self.attempts[key] = self.attempts.get(key, 0) + 1
+                        if self.attempts[key] >= self.max_retries:
+                            dead.append((key, error or status))
+                        else:
+                            retry.append(key)
+                retry_attempt = max((self.attempts[k] for k in retry), default=0)
+
+            if acked:
+                self.outbox.ack(acked)
+                self._finish(acked)
+                with self.cond:
+                    self.stats["acked"] += len(acked)
+            for key, error in dead:
+                print(f"Agency rejected declaration {key}: {error}")
+                self.outbox.dead_letter(key, error)
+                self._finish([key], dead=True)
+                with self.cond:
+                    self.stats["dead"] += 1
+            if retry:
+                self._requeue(retry, self._delay(retry_attempt))
+        except Exception as e:
+            # Never lose track of a batch: anything unexpected goes back to the queue
+            print(f"Agency submission failed unexpectedly: {e}")
+            self._requeue([k for k in keys if k in self.in_flight], self._delay(1))
+        finally:
+            self._slots.release()
+
+    # ---- lifecycle ----
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="agency-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """
+        Send what is pending now and wait up to timeout seconds for results. Anything still
+        undelivered stays in the outbox for the next run.
+        """
+        with self.cond:
+            self._stopping = True
+            self._deadline = time.monotonic() + timeout
+            self.cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=True)
+        self.outbox.close()
+
+    def metrics(self):
+        with self.cond:
+            ms = [v * 1000 for v in self.latencies]
+            stats = dict(self.stats)
+            stats.update({
+                "pending": len(self.ready),
+                "in_flight": len(self.in_flight),
+                "avg_batch": stats["batched_items"] / stats["batches"] if stats["batches"] else None,
+                "ack_p50_ms": percentile(ms, 50),
+                "ack_p95_ms": percentile(ms, 95),
+            })
+        return stats
+
+
+def open_agency_submitter(agency, country, state, airportcode):
+    """A started SubmissionHandler for this airport, configured from settings.yaml; stop() it on exit."""
+    from config.config import (
+        AGENCY_ENDPOINT, AGENCY_TOKEN, AGENCY_MAX_BATCH, AGENCY_MAX_WAIT, AGENCY_POOL_SIZE,
+        AGENCY_MAX_RETRIES, AGENCY_TIMEOUT
+    )
+    client = AgencyClient(AGENCY_ENDPOINT, pool_size=AGENCY_POOL_SIZE, timeout=AGENCY_TIMEOUT, token=AGENCY_TOKEN)
+    return SubmissionHandler(
+        SubmissionOutbox(get_outbox_dir(agency, country, state, airportcode)), client,
+        max_batch=AGENCY_MAX_BATCH, max_wait=AGENCY_MAX_WAIT, senders=AGENCY_POOL_SIZE,
+        max_retries=AGENCY_MAX_RETRIES,
+    ).start()
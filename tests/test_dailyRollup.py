@@ -0,0 +1,41 @@
+import gzip
+import json
+
+from cloudStorageExtract.dailyRollup import DailyBatch
+
+
+def test_append_dedupes_and_reads_back(tmp_path):
+    batch = DailyBatch(str(tmp_path))
+    assert batch.append({"confirmation_number": "C1", "surname": "LOPEZ"})
+    assert not batch.append({"confirmation_number": "C1", "surname": "OTHER"})
+    assert batch.append({"confirmation_number": "C2", "surname": "SMITH"})
+    assert len(batch) == 2
+    assert batch.read("C1")["surname"] == "LOPEZ"
+    # Members concatenate into one valid gzip stream
+    with gzip.open(batch.data_path) as f:
+        assert [json.loads(line)["confirmation_number"] for line in f] == ["C1", "C2"]
+
+
+def test_second_instance_catches_up(tmp_path):
+    first = DailyBatch(str(tmp_path))
+    second = DailyBatch(str(tmp_path))
+    first.append({"confirmation_number": "C1"})
+    assert not second.append({"confirmation_number": "C1"})
+    assert second.append({"confirmation_number": "C2"})
+    assert first.append({"confirmation_number": "C3"})
+    assert sorted(first.compiled_index()["members"]) == ["C1", "C2", "C3"]
+    assert first.read("C2") == {"confirmation_number": "C2"}
+
+
+def test_torn_index_line_and_unindexed_member_are_cut(tmp_path):
+    batch = DailyBatch(str(tmp_path))
+    batch.append({"confirmation_number": "C1"})
+    with open(batch.data_path, "ab") as f:
+        f.write(gzip.compress(b'{"confirmation_number":"C2"}\n'))
+    with open(batch.log_path, "ab") as f:
+        f.write(b'["C2", 4')
+
+    reopened = DailyBatch(str(tmp_path))
+    assert list(reopened.index) == ["C1"]
+    assert reopened.append({"confirmation_number": "C2"})
+    assert DailyBatch(str(tmp_path)).read("C2") == {"confirmation_number": "C2"}
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("boto3")
+
+from parsingTransform.dataStructuring import DataStandardizer
+
+MRZ = ("P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<<<<<<<\n"
+       "L898902C36UTO7408122F1204159ZE184226B<<<<<10")
+
+
+def test_mrz_check_digit():
+    assert DataStandardizer._mrz_check_digit("L898902C3") == "6"
+    assert DataStandardizer._mrz_check_digit("740812") == "2"
+
+
+def test_parse_mrz():
+    out = DataStandardizer().parse_mrz(MRZ)
+    assert out["surname"] == "ERIKSSON"
+    assert out["given_names"] == "ANNA MARIA"
+    assert out["passport_number"] == "L898902C3"
+    assert out["date_of_birth"] == "1974-08-12"
+    assert out["gender"] == "Female"
+
+
+def test_parse_mrz_drops_fields_failing_check_digit():
+    out = DataStandardizer().parse_mrz(MRZ.replace("L898902C36", "L898902C37").replace("7408122", "7408123"))
+    assert "passport_number" not in out
+    assert "date_of_birth" not in out
+
+
+def test_parse_mrz_needs_two_lines():
+    assert DataStandardizer().parse_mrz("P<UTOERIKSSON<<ANNA") == {}
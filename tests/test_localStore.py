@@ -0,0 +1,61 @@
+import os
+
+from cloudStorageExtract.localBucket import LocalBucket
+from cloudStorageExtract.localStore import LocalArtifactStore
+
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_evicts_only_uploaded_unpinned_files_oldest_first(tmp_path):
+    root = tmp_path / "Images"
+    store = LocalArtifactStore(str(root), max_bytes=250, low_water=0.5)
+    uploader = store.uploader(LocalBucket(str(tmp_path / "bucket")))
+    session = store.session()
+    pinned_uploader = store.uploader(LocalBucket(str(tmp_path / "bucket")), session)
+
+    old = write(str(root / "a" / "old.jpg"), 100)
+    uploader.upload_file(old, "Images/a/old.jpg")
+    never_uploaded = write(str(root / "a" / "local.jpg"), 100)
+    store.track(never_uploaded)
+    pinned = write(str(root / "b" / "pinned.jpg"), 100)
+    pinned_uploader.upload_file(pinned, "Images/b/pinned.jpg")
+
+    assert store.evict_once() == 1
+    assert not os.path.exists(old)
+    assert os.path.exists(never_uploaded) and os.path.exists(pinned)
+
+    session.release()
+    assert store.evict_once() == 1
+    assert not os.path.exists(pinned)
+    assert not os.path.exists(root / "b")   # emptied directory pruned
+
+
+def test_rewritten_file_is_not_evicted_until_uploaded_again(tmp_path):
+    root = tmp_path / "Images"
+    store = LocalArtifactStore(str(root), max_bytes=10)
+    uploader = store.uploader(LocalBucket(str(tmp_path / "bucket")))
+    path = write(str(root / "form.json"), 50)
+    uploader.upload_file(path, "Images/form.json")
+    write(path, 60)
+    store.track(path)
+    assert store.evict_once() == 0
+
+    uploader.upload_file(path, "Images/form.json")
+    assert store.evict_once() == 1
+
+
+def test_ledger_survives_restart(tmp_path):
+    root = tmp_path / "Images"
+    store = LocalArtifactStore(str(root))
+    path = write(str(root / "a.jpg"), 10)
+    store.uploader(LocalBucket(str(tmp_path / "bucket"))).upload_file(path, "Images/a.jpg")
+
+    restarted = LocalArtifactStore(str(root), max_bytes=5)
+    restarted.scan()
+    assert restarted.evict_once() == 1
+    assert not os.path.exists(path)
@@ -0,0 +1,30 @@
+from submitLoad.outbox import SubmissionOutbox
+
+
+def test_put_is_idempotent_and_survives_reopen(tmp_path):
+    outbox = SubmissionOutbox(str(tmp_path))
+    assert outbox.put("C1", {"confirmation_number": "C1"})
+    assert not outbox.put("C1", {"confirmation_number": "C1"})
+    assert outbox.put("C2", {"confirmation_number": "C2"})
+    outbox.ack(["C1"])
+    outbox.close()
+
+    reopened = SubmissionOutbox(str(tmp_path))
+    assert [key for key, _ in reopened.items()] == ["C2"]
+    reopened.close()
+
+
+def test_torn_tail_and_dead_letters(tmp_path):
+    outbox = SubmissionOutbox(str(tmp_path))
+    outbox.put("C1", {"n": 1})
+    outbox.put("C2", {"n": 2})
+    outbox.dead_letter("C2", "invalid passport number")
+    outbox.close()
+    with open(outbox.path, "a") as f:
+        f.write('{"op": "put", "key": "C3", "pay')
+
+    reopened = SubmissionOutbox(str(tmp_path))
+    assert [key for key, _ in reopened.items()] == ["C1"]
+    with open(reopened.dead_path) as f:
+        assert '"C2"' in f.read()
+    reopened.close()
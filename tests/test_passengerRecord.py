@@ -0,0 +1,27 @@
+import json
+
+from parsingTransform.passengerRecord import PassengerRecord
+
+
+def test_update_keeps_found_values_and_provenance():
+    record = PassengerRecord()
+    record.update({"surname": "LOPEZ", "nationality": "SPAIN"}, source="passport",
+                  confidence={"surname": 0.9})
+    record.update({"surname": None, "nationality": "SPAIN", "flight_number": "UA415"},
+                  source="boarding_pass:1", confidence=0.7)
+    assert record.surname == "LOPEZ"
+    assert record.provenance["surname"].to_dict() == {"document": "passport", "confidence": 0.9}
+    assert record.provenance["nationality"].to_dict() == {"document": "passport", "confidence": None}
+    assert record.provenance["flight_number"].to_dict() == {"document": "boarding_pass:1", "confidence": 0.7}
+
+
+def test_extras_and_serialization(tmp_path):
+    record = PassengerRecord(surname="LOPEZ")
+    record.set("purpose", "tourism", source="form")
+    assert record.get("purpose") == "tourism"
+    assert "provenance" not in record.to_dict()
+    path = record.save_json(str(tmp_path / "passenger.json"), include_provenance=True)
+    with open(path) as f:
+        data = json.load(f)
+    assert data["surname"] == "LOPEZ"
+    assert data["provenance"]["purpose"]["document"] == "form"
@@ -0,0 +1,59 @@
+import pytest
+
+from parsingTransform.referenceData import SymmetricDeleteIndex, ReferenceData
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return ReferenceData()
+
+
+def test_index_exact_and_fuzzy_lookup():
+    index = SymmetricDeleteIndex(max_distance=2)
+    index.add("United Kingdom", "GBR")
+    index.add("Germany", "DEU")
+    assert index.lookup("united kingdom") == ("GBR", "UNITED KINGDOM", 0)
+    assert index.lookup("UNITED KINGD0M") == ("GBR", "UNITED KINGDOM", 1)
+    assert index.lookup("GERMANV")[0] == "DEU"
+
+
+def test_index_short_terms_match_exactly():
+    index = SymmetricDeleteIndex(max_distance=2)
+    index.add("India", "IND")
+    assert index.lookup("INDLA") is None
+    assert index.lookup("INDIA")[0] == "IND"
+
+
+def test_index_search_text_finds_term_in_line():
+    index = SymmetricDeleteIndex(max_distance=2)
+    index.add("United States", "USA")
+    assert index.search_text("Nationality: UNITED STATES OF")[0] == "USA"
+
+
+def test_match_country(reference):
+    assert reference.match_country("GBR") == "UNITED KINGDOM"
+    assert reference.match_country("6BR") == "UNITED KINGDOM"   # OCR digit repaired
+    assert reference.match_country("Nationality GERMANV") == "GERMANY"
+
+
+def test_match_country_exact_rejects_other_words(reference):
+    assert reference.match_country("Surname", exact=True) is None
+    assert reference.match_country("INDIANA", exact=True) is None
+    assert reference.match_country("INDIAN", exact=True) == "INDIA"
+
+
+def test_match_airline(reference):
+    assert reference.match_airline("DELTA") == "DELTA AIR LINES"
+    assert reference.match_airline("UNITED AIRLINES", free_text=True) == "UNITED AIRLINES"
+
+
+@pytest.mark.parametrize("line", ["ANA MARIA LOPEZ", "LOT 42", "DELTA SEAT 4"])
+def test_match_airline_free_text_ignores_single_word_aliases(reference, line):
+    assert reference.match_airline(line, free_text=True) is None
+
+
+def test_airline_from_flight_and_airport(reference):
+    assert reference.airline_from_flight("UA415") == "UNITED AIRLINES"
+    assert reference.airline_from_flight("ZZ415") is None
+    assert reference.match_airport("LAX") == "LAX"
+    assert reference.match_airport("L4X") is None
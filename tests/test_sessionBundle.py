@@ -0,0 +1,56 @@
+import io
+import os
+import json
+
+from cloudStorageExtract.localBucket import LocalBucket
+from cloudStorageExtract.sessionBundle import SessionBundler, read_index, fetch_member
+
+
+class RangeClient:
+    """get_object with HTTP byte ranges over a LocalBucket directory."""
+    def __init__(self, root):
+        self.root = root
+        self.requests = 0
+
+    def get_object(self, Bucket, Key, Range):
+        self.requests += 1
+        with open(os.path.join(self.root, Key), "rb") as f:
+            data = f.read()
+        spec = Range.split("=", 1)[1]
+        start, end = spec.split("-")
+        body = data[-int(end):] if not start else data[int(start):int(end) + 1]
+        return {"Body": io.BytesIO(body)}
+
+
+def test_bundle_members_fetch_by_range(tmp_path):
+    bucket = LocalBucket(str(tmp_path / "bucket"))
+    frame = tmp_path / "frame.jpg"
+    frame.write_bytes(b"\xff\xd8jpeg-bytes")
+    bundler = SessionBundler(bucket, str(tmp_path / "spool"), "Images/x/s1.bundle")
+    bundler.upload_file(str(frame), "Images/x/frame.jpg")
+    bundler.upload_bytes(b'{"surname": "LOPEZ"}', "Images/x/passenger.json")
+    assert bundler.flush() == {"bundle_key": "Images/x/s1.bundle", "members": 2}
+    assert not os.path.exists(tmp_path / "spool")
+
+    client = RangeClient(bucket.root)
+    index = read_index(client, bucket.bucket_name, "Images/x/s1.bundle")
+    assert set(index["members"]) == {"Images/x/frame.jpg", "Images/x/passenger.json"}
+    assert fetch_member(client, bucket.bucket_name, "Images/x/s1.bundle", index,
+                        "Images/x/frame.jpg") == b"\xff\xd8jpeg-bytes"
+    member = fetch_member(client, bucket.bucket_name, "Images/x/s1.bundle", index, "Images/x/passenger.json")
+    assert json.loads(member) == {"surname": "LOPEZ"}
+    assert client.requests == 4
+
+
+def test_resume_after_torn_manifest(tmp_path):
+    bucket = LocalBucket(str(tmp_path / "bucket"))
+    spool = str(tmp_path / "spool")
+    bundler = SessionBundler(bucket, spool, "Images/x/s1.bundle")
+    bundler.upload_bytes(b"{}", "Images/x/a.json")
+    with open(bundler.manifest_path, "a") as f:
+        f.write('{"key": "Images/x/b.js')
+
+    resumed = SessionBundler(bucket, spool, "Images/x/other.bundle")
+    assert resumed.bundle_key == "Images/x/s1.bundle"
+    resumed.upload_bytes(b"[]", "Images/x/c.json")
+    assert set(SessionBundler(bucket, spool, None).members) == {"Images/x/a.json", "Images/x/c.json"}
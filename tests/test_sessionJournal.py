@@ -0,0 +1,53 @@
+import os
+
+from submitLoad.sessionJournal import SessionJournal
+
+
+class Answers:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def ask(self, key, prompt):
+        return self.answer
+
+
+def test_replay_truncates_torn_tail(tmp_path):
+    journal = SessionJournal.start(str(tmp_path))
+    journal.record("passport", {"path": "a.jpg"})
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"stage": "boarding_pass", "payl')
+
+    reopened = SessionJournal(journal.path)
+    assert reopened.stages == {"passport": {"path": "a.jpg"}}
+    reopened.record("boarding_pass", {"path": "b.jpg"})
+    reopened.close()
+    assert SessionJournal(journal.path).stages["boarding_pass"] == {"path": "b.jpg"}
+
+
+def test_resume_needs_confirmation(tmp_path):
+    journal = SessionJournal.start(str(tmp_path))
+    journal.record("passport")
+    journal.close()
+
+    resumed = SessionJournal.resume_or_start(str(tmp_path), responder=Answers("y"))
+    assert resumed.path == journal.path and resumed.completed("passport")
+    resumed.close()
+
+    fresh = SessionJournal.resume_or_start(str(tmp_path), responder=Answers("n"))
+    assert fresh.path != journal.path and not fresh.stages
+    assert not os.path.exists(journal.path)
+    fresh.close()
+
+
+def test_complete_and_stale_journals_are_deleted(tmp_path):
+    journal = SessionJournal.start(str(tmp_path))
+    journal.complete()
+    assert not os.path.exists(journal.path)
+
+    stale = SessionJournal.start(str(tmp_path))
+    stale.record("passport")
+    stale.close()
+    os.utime(stale.path, (0, 0))
+    assert SessionJournal.find_incomplete(str(tmp_path), max_age_s=60) is None
+    assert not os.path.exists(stale.path)
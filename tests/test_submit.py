@@ -0,0 +1,78 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("cv2")   # submit imports utils, which needs OpenCV
+
+from submitLoad.agencyClient import RetryableAgencyError
+from submitLoad.outbox import SubmissionOutbox
+from submitLoad.submit import SubmissionHandler
+
+
+class FakeClient:
+    """send_batch fails transiently `failures` times, then accepts; remembers what it stored."""
+    def __init__(self, failures=0, reject=()):
+        self.failures = failures
+        self.reject = set(reject)
+        self.stored = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send_batch(self, batch):
+        with self._lock:
+            self.calls += 1
+            if self.failures:
+                self.failures -= 1
+                raise RetryableAgencyError("503", retry_after=0)
+            results = {}
+            for key, payload in batch:
+                if key in self.reject:
+                    results[key] = ("rejected", "invalid")
+                elif key in self.stored:
+                    results[key] = ("duplicate", None)
+                else:
+                    self.stored[key] = payload
+                    results[key] = ("accepted", None)
+            return results
+
+
+def run(handler, keys, timeout=5.0):
+    """Submit, wait until the outbox is drained (retries included), then stop."""
+    for key in keys:
+        handler.submit({"confirmation_number": key})
+    handler.start()
+    deadline = time.monotonic() + timeout
+    while len(handler.outbox) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = handler.metrics()
+    handler.stop(timeout=1.0)
+    return stats
+
+
+def test_retries_transient_failures_until_acked(tmp_path):
+    client = FakeClient(failures=2)
+    handler = SubmissionHandler(SubmissionOutbox(str(tmp_path)), client, max_wait=0.01, backoff=0.01)
+    stats = run(handler, ["C1", "C2", "C1"])
+    assert sorted(client.stored) == ["C1", "C2"]
+    assert stats["submitted"] == 2 and stats["acked"] == 2 and stats["retries"] >= 2
+    assert SubmissionOutbox(str(tmp_path)).items() == []
+
+
+def test_rejections_are_dead_lettered(tmp_path):
+    client = FakeClient(reject=["C2"])
+    handler = SubmissionHandler(SubmissionOutbox(str(tmp_path)), client, max_wait=0.01)
+    stats = run(handler, ["C1", "C2"])
+    assert stats["acked"] == 1 and stats["dead"] == 1
+    assert SubmissionOutbox(str(tmp_path)).items() == []
+
+
+def test_replayed_outbox_is_delivered_once(tmp_path):
+    outbox = SubmissionOutbox(str(tmp_path))
+    outbox.put("C1", {"confirmation_number": "C1"})
+    outbox.close()
+    client = FakeClient()
+    client.stored["C1"] = {"confirmation_number": "C1"}   # delivered before the crash, never acked
+    stats = run(SubmissionHandler(SubmissionOutbox(str(tmp_path)), client, max_wait=0.01), [])
+    assert stats["duplicates"] == 1
+    assert SubmissionOutbox(str(tmp_path)).items() == []
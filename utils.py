@@ -7,12 +7,15 @@ Helper functions: logging, config loading, error handling, general utilities.
 # ==== Standard Library ====
 
 import os
-import json
 from datetime import datetime
 import uuid
+import cv2
 
 from parsingTransform.dataStructuring import DataStandardizer
-from processingTransform.ocrExtract import OCRExtractor
+from parsingTransform.passengerRecord import dumps
+from processingTransform.ocrExtract import OCRExtractor, FieldOCRExtractor
+from processingTransform.layoutTemplates import get_template
+from processingTransform.ocrEngines import engine_for
 
 def get_daypart(hour):
     if 5 <= hour < 12:
@@ -30,7 +33,7 @@ def generate_confirmation_number(airport_code):
     code = str(uuid.uuid4().int)[-5:]  
     return f"{airport_code.upper()}-{year}-{code}"
 
-def generate_s3_key(images, agency, country, state, airportcode, date, document_type, subtype):
+def generate_s3_key(images, agency, country, state, airportcode, date, document_type, subtype, ext="jpg"):
     now = datetime.now()
     timestamp = now.strftime("%Y%m%d-%H%M%S-%f")
     uuid_part = uuid.uuid4().hex
@@ -38,44 +41,115 @@ def generate_s3_key(images, agency, country, state, airportcode, date, document_
     key = (
         f"{images}/{agency}/{country}/{state}/{airportcode}/{date}/"
         f"{document_type}/{subtype}/{daypart}/"
-        f"img-{uuid_part}-{timestamp}.jpg"
+        f"img-{uuid_part}-{timestamp}.{ext}"
     )
     return key
 
-def process_passport_document(camera, s3, agency, country, state, airportcode, BUCKET_NAME):
-    doc_type, subtype = "passport", "main"
-    # --- 1. Capture image
-    full_img_path, crop_img_path, s3_key_full, s3_key_crop = camera.capture_passport_with_overlay(
-        doc_type, subtype, agency, country, state, airportcode
+def build_capture_paths(storage_root, doc_type, subtype, agency, country, state, airportcode, ext="jpg"):
+    """
+    Returns (local_full_path, local_crop_path, s3_key_full, s3_key_crop) for a new capture,
+    ensures the local directories exist.
+    """
+    date = datetime.now().strftime("%Y%m%d")
+    s3_key_full = generate_s3_key(
+        images="Images", agency=agency, country=country, state=state,
+        airportcode=airportcode, date=date, document_type=doc_type, subtype=subtype, ext=ext
     )
-    if not all([full_img_path, crop_img_path, s3_key_full, s3_key_crop]):
-        print("Passport image not captured.")
-        return None
-
+    s3_key_crop = s3_key_full.replace(f"/{subtype}/", f"/{subtype}-crop/")
+    local_full_path = os.path.join(storage_root, s3_key_full)
+    local_crop_path = os.path.join(storage_root, s3_key_crop)
+    os.makedirs(os.path.dirname(local_full_path), exist_ok=True)
+    os.makedirs(os.path.dirname(local_crop_path), exist_ok=True)
+    return local_full_path, local_crop_path, s3_key_full, s3_key_crop
+
+# Standardizer method for each document type
+STANDARDIZERS = {
+    "passport": "standardize",
+    "boarding_pass": "standardize_boarding_pass",
+}
+
+# Fields that, once found, end reading a multi-page PDF (later pages are never loaded)
+PDF_STOP_FIELDS = {
+    "passport": ("surname", "passport_number"),
+    "boarding_pass": ("flight_number", "from_origin", "to_destination", "departure_date"),
+}
+
+def save_capture(frame, crop, doc_type, subtype, agency, country, state, airportcode, storage_root=None):
+    """Write an in-memory capture (full frame + binarized crop) under the usual key layout."""
+    if storage_root is None:
+        from config.config import STORAGE_ROOT
+        storage_root = STORAGE_ROOT
+    paths = build_capture_paths(storage_root, doc_type, subtype, agency, country, state, airportcode)
+    local_full_path, local_crop_path = paths[0], paths[1]
+    cv2.imwrite(local_full_path, frame)
+    cv2.imwrite(local_crop_path, crop)
+    return paths
+
+def process_captured_document(s3, doc_type, subtype, full_img_path, crop_img_path, s3_key_full, s3_key_crop):
+    """
+    Upload, OCR and standardize one captured document (steps 2-4 of every stage).
+    A PDF (full and crop path both the .pdf) is read from its text layer instead of OCR'd.
+    """
+    is_pdf = crop_img_path.lower().endswith(".pdf")
     # --- 2. Upload to S3
     s3.upload_file(full_img_path, s3_key_full)
-    s3.upload_file(crop_img_path, s3_key_crop)
+    if crop_img_path != full_img_path:
+        s3.upload_file(crop_img_path, s3_key_crop)
 
     # --- 3. OCR extraction & save raw OCR JSON
-    ocr = OCRExtractor(crop_img_path)
+    from config.config import OCR_FIELD_TEMPLATES, OCR_FIELD_WORKERS
+    engine = engine_for(doc_type)
+    if is_pdf:
+        # Embedded text layer; only image-only pages are rasterized and OCR'd
+        from processingTransform.pdfExtract import PDFTextExtractor
+        ocr = PDFTextExtractor(crop_img_path, engine=engine)
+    elif OCR_FIELD_TEMPLATES and get_template(doc_type):
+        # Per-field crops OCR'd concurrently with field-specific PSM/whitelist
+        ocr = FieldOCRExtractor(doc_type, crop_img_path, max_workers=OCR_FIELD_WORKERS or None, engine=engine)
+    else:
+        ocr = OCRExtractor(crop_img_path, engine=engine)
     ocr_raw_path = crop_img_path.rsplit('.', 1)[0] + "-ocr_raw.json"
-    raw_data = ocr.extract(save_json_path=ocr_raw_path)
+    standardizer = DataStandardizer()
+    standardize = getattr(standardizer, STANDARDIZERS[doc_type])
+    if is_pdf:
+        # Pages are read one at a time; stop as soon as the text so far has the key fields
+        def done(text):
+            data = standardize({"text": text})
+            return all(data.get(name) for name in PDF_STOP_FIELDS[doc_type])
+        raw_data = ocr.extract(save_json_path=ocr_raw_path, done=done)
+    else:
+        raw_data = ocr.extract(save_json_path=ocr_raw_path)
     # Optional: Upload raw OCR to S3
     s3.upload_file(ocr_raw_path, s3_key_crop.rsplit('.', 1)[0] + "-ocr_raw.json")
 
     # --- 4. Data Standardizing
-    standardizer = DataStandardizer()
-    clean_data = standardizer.standardize(raw_data)
-    local_json_path = crop_img_path + ".passenger.json"
-    standardizer.save_json_local(clean_data, local_json_path)
-    s3.upload_file(local_json_path, s3_key_crop + ".passenger.json")
+    clean_data = standardize(raw_data)
+    # Kept in memory for the PassengerRecord; only the S3 copy is persisted here
+    s3.upload_bytes(dumps(clean_data), s3_key_crop + ".passenger.json")
+
+    source = doc_type if doc_type == "passport" else f"{doc_type}:{subtype}"
+    artifacts = {
+        full_img_path: s3_key_full,
+        crop_img_path: s3_key_crop,
+        ocr_raw_path: s3_key_crop.rsplit('.', 1)[0] + "-ocr_raw.json",
+    }
+    return {"data": clean_data, "source": source, "artifacts": artifacts, "confidence": raw_data.get("confidence"),
+            "field_confidence": raw_data.get("field_confidence")}
 
+def process_passport_document(camera, s3, agency, country, state, airportcode, BUCKET_NAME):
+    doc_type, subtype = "passport", "main"
+    # --- 1. Capture image
+    full_img_path, crop_img_path, s3_key_full, s3_key_crop = camera.capture_passport_with_overlay(
+        doc_type, subtype, agency, country, state, airportcode
+    )
+    if not all([full_img_path, crop_img_path, s3_key_full, s3_key_crop]):
+        print("Passport image not captured.")
+        return None
 
-    print(f"Passport processed: {clean_data} JSON Path: {local_json_path}")
-    return {"data": clean_data, "json_path": local_json_path}
-
-    # print(f"Passport processed: {clean_data}")
-    # return clean_data
+    result = process_captured_document(
+        s3, doc_type, subtype, full_img_path, crop_img_path, s3_key_full, s3_key_crop)
+    print(f"Passport processed: {result['data']}")
+    return result
 
 def process_boarding_pass_document(camera, s3, agency, country, state, airportcode, subtype, BUCKET_NAME):
     doc_type = "boarding_pass"
@@ -87,27 +161,10 @@ def process_boarding_pass_document(camera, s3, agency, country, state, airportco
         print(f"Boarding pass ({subtype}) image not captured.")
         return None
 
-    # --- 2. Upload to S3
-    s3.upload_file(full_img_path, s3_key_full)
-    s3.upload_file(crop_img_path, s3_key_crop)
-
-    # --- 3. OCR extraction & save raw OCR JSON
-    ocr = OCRExtractor(crop_img_path)
-    ocr_raw_path = crop_img_path.rsplit('.', 1)[0] + "-ocr_raw.json"
-    raw_data = ocr.extract(save_json_path=ocr_raw_path)
-    # Optional: Upload raw OCR to S3
-    s3.upload_file(ocr_raw_path, s3_key_crop.rsplit('.', 1)[0] + "-ocr_raw.json")
-
-    # --- 4. Data Standardizing
-    standardizer = DataStandardizer()
-    clean_data = standardizer.standardize_boarding_pass(raw_data)
-    local_json_path = crop_img_path + ".passenger.json"
-    standardizer.save_json_local(clean_data, local_json_path)
-    s3.upload_file(local_json_path, s3_key_crop + ".passenger.json")
-
-    print(f"Boarding pass {subtype} processed: {clean_data} JSON Path: {local_json_path}")
-    return {"data": clean_data, "json_path": local_json_path}
-    # return clean_data
+    result = process_captured_document(
+        s3, doc_type, subtype, full_img_path, crop_img_path, s3_key_full, s3_key_crop)
+    print(f"Boarding pass {subtype} processed: {result['data']}")
+    return result
 
 def get_completed_form_dir(agency, country, state, airportcode, base_dir=None):
     """
@@ -130,13 +187,10 @@ def completed_form_s3_key(local_path):
     key = local_path.split("/Images/", 1)[-1]
     return f"Images/{key}"
 
-def extract_user_info_from_form(form_json_path):
-    """Returns (name, email, form dict) from completed form JSON path."""
-    with open(form_json_path) as f:
-        data = json.load(f)
-    surname = data.get("surname", "")
-    given_names = data.get("given_names", "")
-    email = data.get("email", "")
-    full_name = f"{given_names} {surname}".strip()
-    confirmation_number = data.get("confirmation_number")
-    return full_name, email, data, confirmation_number
+def percentile(values, pct, empty=None):
+    """Nearest-rank percentile of a list of numbers (empty when there are none)."""
+    if not values:
+        return empty
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -0,0 +1,263 @@
+"""
+workflow.py
+-----------
+Passenger workflow (capture -> OCR -> form -> store -> email), shared by the
+interactive app and headless/load-test drivers.
+"""
+
+# ==== Standard Library ====
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from formOpLoad.formOperations import customs_declaration_cli_form, FormOperations, ConsoleResponder
+from parsingTransform.passengerRecord import PassengerRecord
+from submitLoad.email import send_submission_email
+from utils import (
+    process_passport_document, process_boarding_pass_document, process_captured_document,
+    save_capture, get_completed_form_dir, completed_form_s3_key, generate_confirmation_number
+)
+from config.config import BUCKET_NAME, ROLLUP_PER_FORM_UPLOAD
+
+WORKFLOW_STAGES = [
+    {"type": "passport"},
+    {"type": "boarding_pass", "subtype": "arrival"},
+    {"type": "boarding_pass", "subtype": "departure"}
+]
+
+
+@contextmanager
+def timed(timings, name):
+    """Record the wall time of a block into timings[name] (no-op when timings is None)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = time.perf_counter() - start
+
+
+def journaled(journal, stage, fn):
+    """
+    Run fn() once per session: if the journal already holds this stage, return its recorded
+    result instead (no recapture, re-OCR or re-upload); otherwise record fn's result.
+    """
+    if journal is not None and journal.completed(stage):
+        print(f"Resuming: {stage} already completed, skipping.")
+        return journal.get(stage)
+    result = fn()
+    if journal is not None and result is not None:
+        journal.record(stage, result)
+    return result
+
+
+def flush_bundle(s3, journal=None, timings=None):
+    """Send a SessionBundler's spooled uploads as one bundle (no-op for a plain uploader)."""
+    if not hasattr(s3, "flush"):
+        return None
+
+    def run():
+        with timed(timings, "bundle"):
+            return s3.flush()
+    return journaled(journal, "bundle", run)
+
+
+def capture_staged_documents(camera, s3, agency, country, state, airportcode, responder, timings=None, journal=None):
+    """Fixed order: passport, arrival, optional departure. Returns the per-document results."""
+    results = []
+    for stage in WORKFLOW_STAGES:
+        if stage["type"] == "passport":
+            print("\n--- STAGE: PASSPORT ---")
+
+            def run():
+                with timed(timings, "passport"):
+                    return process_passport_document(
+                        camera, s3, agency, country, state, airportcode, BUCKET_NAME)
+            result = journaled(journal, "passport", run)
+
+        elif stage["type"] == "boarding_pass":
+            subtype = stage["subtype"]
+            print(f"\n--- STAGE: BOARDING PASS ({subtype.upper()}) ---")
+            if subtype == "departure":
+                answer = journaled(journal, "process_departure", lambda: responder.ask(
+                    "process_departure", "Process DEPARTURE boarding pass? (y/n): ").strip().lower())
+                if not answer.startswith("y"):
+                    continue
+
+            def run():
+                with timed(timings, subtype):
+                    return process_boarding_pass_document(
+                        camera, s3, agency, country, state, airportcode, subtype, BUCKET_NAME
+                    )
+            result = journaled(journal, subtype, run)
+
+        if result:
+            results.append(result)
+    return results
+
+
+def capture_routed_documents(camera, s3, classifier, agency, country, state, airportcode, timings=None, journal=None,
+                             storage_root=None):
+    """
+    Single capture loop: documents in any order, each classified before OCR and sent to the
+    matching standardizer. The first boarding pass is the arrival, the second the departure.
+    Ends when the operator quits (or the source is exhausted) or all three documents are in.
+    """
+    names = ("passport", "arrival", "departure")
+    captured = {k: journal.get(k) for k in names if journal is not None and journal.completed(k)}
+    if captured:
+        print(f"Resuming: {', '.join(captured)} already captured, skipping.")
+    while not all(k in captured for k in names):
+        frame, crop = camera.capture_document_with_overlay()
+        if frame is None:
+            break
+        # File sources have no guide box: the image is the document
+        doc_type, features = classifier.classify(frame, getattr(camera, "guide_box", None))
+        if doc_type is None:
+            print(f"Could not recognise the document ({features['scores']}), please capture it again.")
+            continue
+
+        if doc_type == "passport":
+            name, subtype = "passport", "main"
+        else:
+            name = subtype = "arrival" if "arrival" not in captured else "departure"
+        if name in captured:
+            print(f"Replacing previously captured {name}.")
+        print(f"\n--- ROUTED: {name.upper()} ---")
+        with timed(timings, name):
+            if hasattr(camera, "save_document"):
+                # File sources keep PDFs as PDFs (read from their text layer, not re-OCR'd)
+                paths = camera.save_document(frame, crop, doc_type, subtype, agency, country, state, airportcode)
+            else:
+                paths = save_capture(frame, crop, doc_type, subtype, agency, country, state, airportcode, storage_root)
+            captured[name] = process_captured_document(s3, doc_type, subtype, *paths)
+        if journal is not None:
+            journal.record(name, captured[name])
+        print(f"{name} processed: {captured[name]['data']}")
+
+    if "passport" not in captured:
+        print("Passport image not captured.")
+    # Same merge order as the staged flow
+    return [captured[k] for k in names if k in captured]
+
+
+def run_passenger_workflow(camera, s3, agency, country, state, airportcode,
+                           responder=None, mailer=send_submission_email, timings=None, classifier=None,
+                           journal=None, rollup=None, pins=None, submitter=None, storage_root=None):
+    """
+    Run one passenger end to end. camera is any image source with the CameraOverlay
+    capture methods, s3 anything with upload_file/upload_bytes, responder answers the
+    prompts (console by default). With a classifier, documents are captured in any order
+    and routed automatically. With a SessionJournal, every completed stage is recorded and
+    a resumed journal skips the stages it already holds. With a DailyRollup, the completed
+    form is also appended to the airport-day batch. With ArtifactPins (store.session(), also
+    given to store.uploader), the session's local artifacts stay pinned (never evicted)
+    from upload until the session ends. With a SessionBundler
+    as s3, the session's uploads go out as one bundle once the form is stored. With a
+    SubmissionHandler, the declaration is queued for delivery to the agency. storage_root
+    overrides STORAGE_ROOT for routed captures and the completed form (staged captures
+    are written by the camera, e.g. FileImageSource(storage_root=...)).
+    Returns the submitted PassengerRecord, or None.
+    """
+    responder = responder or ConsoleResponder()
+    if classifier is not None:
+        results = capture_routed_documents(
+            camera, s3, classifier, agency, country, state, airportcode, timings, journal, storage_root)
+    else:
+        results = capture_staged_documents(
+            camera, s3, agency, country, state, airportcode, responder, timings, journal)
+    return complete_passenger(results, s3, agency, country, state, airportcode, responder, mailer,
+                              timings, journal, rollup, pins, submitter, storage_root)
+
+
+def complete_passenger(results, s3, agency, country, state, airportcode, responder=None,
+                       mailer=send_submission_email, timings=None, journal=None, rollup=None,
+                       pins=None, submitter=None, storage_root=None):
+    """
+    Everything after capture for one passenger: merge the per-document results (passport,
+    arrival, departure order), form, confirmation number, store, bundle, agency, email.
+    Used by run_passenger_workflow and by the multi-camera lanes host.
+    Returns the submitted PassengerRecord, or None.
+    """
+    responder = responder or ConsoleResponder()
+    # Single in-memory record for the whole passenger; persisted once when the form is saved
+    record = PassengerRecord()
+    if pins is not None:
+        # Already pinned on upload; this covers artifacts of a resumed session's earlier run
+        pins.pin(*[path for result in results for path in result.get("artifacts", {})])
+    for result in results:
+        # Per-field OCR confidence where the field had its own region, else the document's
+        field_confidence = result.get("field_confidence") or {}
+        confidence = {key: field_confidence.get(key, result.get("confidence")) for key in result["data"]}
+        record.update(result["data"], source=result["source"], confidence=confidence)
+
+    prefill_data = record.to_dict()
+
+    # --- Prefill form ---
+    form = FormOperations()
+    form.prefill(prefill_data)
+
+    # --- Rest of form ---
+    def run_form():
+        with timed(timings, "form"):
+            return customs_declaration_cli_form(prefill_data, responder=responder)
+    form_result = journaled(journal, "form", run_form)
+    if not form_result:
+        flush_bundle(s3, journal)
+        if journal is not None:
+            journal.complete(outcome="cancelled")
+        if pins is not None:
+            pins.release()
+        return None
+
+    record.update(form_result, source="form")
+    # Generate confirmation number BEFORE saving (journaled so a resume keeps the same number)
+    confirmation_number = journaled(journal, "confirmation_number", lambda: generate_confirmation_number(airportcode))
+    record.set("confirmation_number", confirmation_number, source="system")
+
+    def store_form():
+        with timed(timings, "store"):
+            base_dir = os.path.join(storage_root, "Images") if storage_root else None
+            completed_dir = get_completed_form_dir(agency, country, state, airportcode, base_dir)
+            # Confirmation number keeps filenames unique when several passengers finish in the same second
+            filename = f"declaration_{datetime.now().strftime('%Y%m%d-%H%M%S')}-{record.confirmation_number}.json"
+            local_path = os.path.join(completed_dir, filename)
+            # Stored form carries where each value came from (document, OCR confidence)
+            record.save_json(local_path, include_provenance=True)
+            print(f"Submission saved to {local_path}")
+
+            if rollup is not None:
+                rollup.append(record.to_dict(include_provenance=True))
+                if not ROLLUP_PER_FORM_UPLOAD:
+                    return {"artifacts": {}}
+
+            s3_key = completed_form_s3_key(local_path)
+            s3.upload_file(local_path, s3_key)
+            if hasattr(s3, "flush"):
+                print(f"Spooled into the session bundle: {s3_key}")
+            else:
+                print(f"Uploaded to S3: s3://{s3.bucket_name}/{s3_key}")
+            return {"artifacts": {local_path: s3_key}}
+    journaled(journal, "store", store_form)
+    flush_bundle(s3, journal, timings)
+
+    # Agency delivery: durably queued here, sent in micro-batches in the background
+    if submitter is not None:
+        journaled(journal, "agency", lambda: {"queued": submitter.submit(record.to_dict())})
+
+    # Email confirmation
+    def email():
+        with timed(timings, "email"):
+            if record.email:
+                mailer(record.email, record.full_name(), record.confirmation_number, record.to_dict())
+                return {"sent_to": record.email}
+            print("No user email provided, skipping email notification.")
+            return {"sent_to": None}
+    journaled(journal, "email", email)
+
+    if journal is not None:
+        journal.complete()
+    if pins is not None:
+        pins.release()
+    return record